@@ -2,6 +2,9 @@
 Parse PyAssimp's structs.py and generate new-style struct definitions
 for Impasse
 
+Usage: python convert_pyassimp.py [output_path]
+Writes to stdout if no output path is given.
+
 TODO: Should be changed to parse the C headers directly. PyAssimp has
   a structsgen.py that's meant to do this, but it doesn't appear to
   work against assimp master, and its structs.py has actually been
@@ -9,12 +12,16 @@ TODO: Should be changed to parse the C headers directly. PyAssimp has
 """
 
 import ast
-import collections
+import functools
+import hashlib
 import inspect
+import io
+import json
+import pathlib
 import re
-from typing import NamedTuple, Dict, Optional, List
+import sys
+from typing import NamedTuple, Dict, Optional, List, Iterable
 
-import pyassimp.structs as s
 
 TUPLE_STRUCTS = {
     "Matrix4x4": ("numpy.single", (4, 4), 16),
@@ -24,319 +31,682 @@ TUPLE_STRUCTS = {
     "Color3D": ("numpy.single", (3,), 3),
     "Color4D": ("numpy.single", (4,), 4),
     "Quaternion": ("numpy.single", (4,), 4),
-    "Plane": ("numpy.single", (2,), 2),
+    "Plane": ("numpy.single", (4,), 4),
     "Texel": ("numpy.ubyte", (4,), 4),
 }
 
-SUPPORTS_MAPPING = {"Metadata", "Material"}
+# Struct and type names get compared against these constantly, intern them
+# so the comparisons can usually short-circuit on identity.
+TUPLE_STRUCTS = {sys.intern(k): v for k, v in TUPLE_STRUCTS.items()}
 
+SUPPORTS_MAPPING = {sys.intern(x) for x in ("Metadata", "Material")}
 
-class FieldTypeData(NamedTuple):
-    name: str
-    base_name: str
-    python_name: str
-    full_sig: str
-    pointer_type: str
-    array_len: Optional[int]
-    python_type_name: Optional[str]
-    builtin: bool
-    comments: List[str]
+_CLASS_HEADER_TMPL = (
+    "class {name}({base}):\n"
+    "{doc}"
+    "    __slots__ = ()\n"
+    "    C_TYPE = \"struct ai{name}\"\n"
+).format
+_FIELD_TMPL = "    {py_name}: {type_sig} = {accessor}\n".format
+
+# (struct name, field name) -> fn(FieldTypeData) -> (type sig, accessor) for
+# fields that need a hand-written accessor.
+_SPECIAL_ACCESSORS = {
+    ("Texture", "achFormatHint"): lambda t: (
+        "str", f"SimpleAccessor(name={t.name!r}, adapter=CStrAdapter({t.array_len}))"
+    ),
+    ("Texture", "pcData"): lambda t: ("Union[bytearray, numpy.ndarray]", "TextureDataAccessor()"),
+    ("MaterialProperty", "mData"): lambda t: ("Any", "MaterialPropertyDataAccessor()"),
+    ("MetadataEntry", "mData"): lambda t: ("Any", "MetadataEntryDataAccessor()"),
+    ("ExportDataBlob", "data"): lambda t: ("Union[bytearray]", "BoundedBufferAccessor('data', 'size')"),
+    ("Mesh", "mFaces"): lambda t: (
+        "BaseSequence[BaseSequence[int]]",
+        "DynamicSequenceAccessor('mFaces', 'mNumFaces', ProxyAdapter(Face, 'indices'))",
+    ),
+}
+# struct name -> [(field name, ctypes type name, comments)] for fields that
+# PyAssimp's structs.py doesn't have yet, appended to the end of the struct.
+_EXTRA_FIELDS = {
+    "Mesh": [
+        ("mAABB", "AABB", [
+            "The bounding box of the mesh's vertices. Only filled in if",
+            "the GenBoundingBoxes postprocessing step was used, all zeroes otherwise.",
+        ]),
+    ],
+}
+# struct name -> [(name, doc, comments, [(field name, ctypes type name, comments)])]
+# for structs that PyAssimp's structs.py doesn't have yet, inserted after that struct.
+_EXTRA_STRUCTS = {
+    "Ray": [
+        ("AABB", "See 'aabb.h' for details.", [" Axis-aligned bounding box"], [
+            ("mMin", "Vector3D", []),
+            ("mMax", "Vector3D", []),
+        ]),
+    ],
+}
+# struct name -> source for extra class attributes, emitted after `C_TYPE`.
+# `DTYPE`s here must match the struct's layout, tests.py checks their sizes.
+_CLASS_ATTRS = {
+    "VertexWeight": (
+        "    # Matches the struct's layout, for reading whole arrays of weights at once\n"
+        "    DTYPE: ClassVar[numpy.dtype] = numpy.dtype([('vertex_id', numpy.uint32), ('weight', numpy.float32)])\n"
+    ),
+    "MeshKey": (
+        "    # Matches the struct's layout, including the padding after the index\n"
+        "    DTYPE: ClassVar[numpy.dtype] = numpy.dtype({\n"
+        "        'names': ['time', 'value'],\n"
+        "        'formats': [numpy.float64, numpy.uint32],\n"
+        "        'offsets': [0, 8],\n"
+        "        'itemsize': 16,\n"
+        "    })\n"
+    ),
+    "VectorKey": (
+        "    # Matches the struct's layout, including the padding after the vector\n"
+        "    DTYPE: ClassVar[numpy.dtype] = numpy.dtype({\n"
+        "        'names': ['time', 'value'],\n"
+        "        'formats': [numpy.float64, (numpy.float32, 3)],\n"
+        "        'offsets': [0, 8],\n"
+        "        'itemsize': 24,\n"
+        "    })\n"
+    ),
+    "QuatKey": (
+        "    # Matches the struct's layout, for reading whole arrays of keys at once\n"
+        "    DTYPE: ClassVar[numpy.dtype] = numpy.dtype([('time', numpy.float64), ('value', numpy.float32, 4)])\n"
+    ),
+}
+_VERTEX_PROP_STRUCTS = {"Mesh", "AnimMesh"}
+_VERTEX_PROP_FIELDS = {"mTextureCoords", "mColors"}
+_VERTEX_VEC_FIELDS = ("mVertices", "mNormals", "mTangents", "mBitangents")
+
+# (struct name, field name) -> [(python name, type sig, accessor, doc)] for
+# extra attributes to put directly after a field, like alternate views of it.
+_EXTRA_ACCESSORS = {
+    ("String", "data"): [(
+        "value", "str", "StringValueAccessor()",
+        "`data` decoded as UTF-8, without going through it byte by byte",
+    )],
+    ("MaterialPropertyString", "data"): [(
+        "value", "str", "StringValueAccessor()",
+        "`data` decoded as UTF-8, without going through it byte by byte",
+    )],
+    ("Face", "mIndices"): [(
+        "indices_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mIndices', 'mNumIndices', numpy.dtype(numpy.uint32))",
+        "`indices` as a zero-copy uint32 array",
+    )],
+    ("Bone", "mWeights"): [(
+        "weights_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mWeights', 'mNumWeights', VertexWeight.DTYPE)",
+        "`weights` as a zero-copy structured array with `vertex_id` and `weight` fields",
+    )],
+    ("NodeAnim", "mPositionKeys"): [(
+        "position_keys_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mPositionKeys', 'mNumPositionKeys', VectorKey.DTYPE)",
+        "`position_keys` as a zero-copy structured array with `time` and `value` fields",
+    )],
+    ("NodeAnim", "mRotationKeys"): [(
+        "rotation_keys_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mRotationKeys', 'mNumRotationKeys', QuatKey.DTYPE)",
+        "`rotation_keys` as a zero-copy structured array with `time` and `value` (w, x, y, z) fields",
+    )],
+    ("NodeAnim", "mScalingKeys"): [(
+        "scaling_keys_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mScalingKeys', 'mNumScalingKeys', VectorKey.DTYPE)",
+        "`scaling_keys` as a zero-copy structured array with `time` and `value` fields",
+    )],
+    ("MeshAnim", "mKeys"): [(
+        "keys_array",
+        "numpy.ndarray",
+        "ContiguousVecAccessor('mKeys', 'mNumKeys', MeshKey.DTYPE)",
+        "`keys` as a zero-copy structured array with `time` and `value` fields",
+    )],
+    ("MeshMorphKey", "mWeights"): [
+        (
+            "values_array",
+            "numpy.ndarray",
+            "ContiguousVecAccessor('mValues', 'mNumValuesAndWeights', numpy.dtype(numpy.uint32))",
+            "`values` as a zero-copy uint32 array",
+        ),
+        (
+            "weights_array",
+            "numpy.ndarray",
+            "ContiguousVecAccessor('mWeights', 'mNumValuesAndWeights', numpy.dtype(numpy.float64))",
+            "`weights` as a zero-copy float64 array",
+        ),
+    ],
+    ("Mesh", "mFaces"): [(
+        "triangles_array",
+        "Optional[numpy.ndarray]",
+        "TriangleIndicesAccessor('mFaces')",
+        "The indices of all faces as a single (mNumFaces, 3) uint32 array.\n"
+        "None unless all faces are triangles, as after the Triangulate step.",
+    )],
+}
+
+# Per-vertex vectors are a single (num_vertices, 3) array, the old sequence
+# of per-vertex arrays is still around under an `_iter` name.
+for _struct_name in _VERTEX_PROP_STRUCTS:
+    for _field_name in _VERTEX_VEC_FIELDS:
+        _SPECIAL_ACCESSORS[(_struct_name, _field_name)] = lambda t: (
+            "numpy.ndarray", f"ContiguousVecAccessor({t.name!r}, 'mNumVertices', {t.python_type_name})"
+        )
+        _py_name = _field_name[1:].lower()
+        _EXTRA_ACCESSORS[(_struct_name, _field_name)] = [(
+            f"{_py_name}_iter",
+            "BaseSequence[numpy.ndarray]",
+            f"DynamicSequenceAccessor({_field_name!r}, 'mNumVertices', Vector3D)",
+            f"`{_py_name}` as a sequence of per-vertex arrays, as it used to be",
+        )]
+
+_CAMEL_SPLIT_RE = re.compile(r'((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))')
+_COMMENT_RE = re.compile(r"^\s*#")
+
+
+class FieldTypeData:
+    # Plain slotted class rather than a NamedTuple, we make a lot of these
+    # and never need them to behave like tuples.
+    __slots__ = (
+        "name", "base_name", "python_name", "full_sig", "pointer_type",
+        "array_len", "python_type_name", "builtin", "comments",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        base_name: str,
+        python_name: str,
+        full_sig: str,
+        pointer_type: str,
+        array_len: Optional[int],
+        python_type_name: Optional[str],
+        builtin: bool,
+        comments: List[str],
+    ):
+        self.name = name
+        self.base_name = base_name
+        self.python_name = python_name
+        self.full_sig = full_sig
+        self.pointer_type = pointer_type
+        self.array_len = array_len
+        self.python_type_name = python_type_name
+        self.builtin = builtin
+        self.comments = comments
 
 
 class StructData(NamedTuple):
     name: str
     doc: str
     fields: Dict[str, FieldTypeData]
+    # Comments that apply to the struct as a whole rather than a single field
+    comments: List[str]
 
 
-def scan_structs():
+@functools.lru_cache(maxsize=None)
+def _parse_source():
+    """
+    Read and parse PyAssimp's structs.py, it won't change within a run
+
+    Returns the AST along with the file's comment blocks.
+    """
+    # Importing this loads the assimp library, so only do it when generating.
+    import pyassimp.structs as s
     # We need to read the AST if we want to pull comments and
     # figure out the original order of the structs.
-    with open(s.__file__, "r") as f:
-        source = f.read()
+    source_bytes = pathlib.Path(s.__file__).read_bytes()
+    structs_ast = ast.parse(source_bytes, s.__file__)
+    # Stream the lines rather than keeping a list of all of them around,
+    # only the comments are of any interest.
+    comment_blocks = _collect_comment_blocks(io.StringIO(source_bytes.decode("utf8")))
+    return structs_ast, comment_blocks
+
+
+# ctypes primitive name -> (C declaration, Python type name)
+_CTYPE_TABLE = {
+    "c_bool": ("bool", None),
+    "c_char": ("char", "int"),
+    "c_byte": ("char", "int"),
+    "c_ubyte": ("unsigned char", "int"),
+    "c_short": ("short", None),
+    "c_ushort": ("unsigned short", None),
+    "c_int": ("int", "int"),
+    "c_uint": ("unsigned int", "int"),
+    "c_long": ("long", "int"),
+    "c_ulong": ("unsigned long", "int"),
+    "c_longlong": ("long long", "int"),
+    "c_ulonglong": ("unsigned long long", "int"),
+    "c_float": ("float", "float"),
+    "c_double": ("double", "float"),
+    "c_void": ("void", None),
+}
+
+# LP_ classes are automatically generated pointer classes,
+# a _p suffix _also_ makes something a pointer.
+_POINTER_RE = re.compile(r'^((?:LP_)*)(.*?)((?:_p)*)$')
+_ARRAY_RE = re.compile(r'^(.*)_Array_(\d+)$')
 
-    field_locs = collections.defaultdict(dict)
-    field_comments = collections.defaultdict(dict)
-    structs_ast = ast.parse(source, s.__file__)
+
+@functools.lru_cache(maxsize=None)
+def _resolve_ctype(type_name: str):
+    """
+    Decode a ctypes type name into its C declaration parts
+
+    Returns a tuple of (C type, pointer prefix, array suffix, array length,
+    python type name, builtin). The same handful of types are used by
+    pretty much every struct, so only decode each of them once.
+    """
+    ptr_match = _POINTER_RE.match(type_name)
+    ptr_prefix = "*" * (ptr_match.group(1).count("LP_") + ptr_match.group(3).count("_p"))
+    core_name = ptr_match.group(2)
+
+    suffix = ""
+    array_len = None
+    array_match = _ARRAY_RE.match(core_name)
+    if array_match:
+        core_name = array_match.group(1)
+        array_len = int(array_match.group(2))
+        suffix = f"[{array_len}]"
+
+    if core_name.startswith("c_"):
+        # from ctypes proper
+        if core_name not in _CTYPE_TABLE:
+            raise ValueError(core_name)
+        c_decl, python_type_name = _CTYPE_TABLE[core_name]
+        if ptr_prefix and c_decl.endswith("char"):
+            # char pointers aren't ints
+            python_type_name = None
+        if python_type_name:
+            python_type_name = sys.intern(python_type_name)
+        return c_decl, ptr_prefix, suffix, array_len, python_type_name, True
+    # Not from ctypes, must be a struct from assimp.
+    if "_" in core_name:
+        raise ValueError(core_name)
+    return "struct ai" + core_name, ptr_prefix, suffix, array_len, sys.intern(core_name), False
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_doc(cls) -> str:
+    return inspect.getdoc(cls) or ""
+
+
+@functools.lru_cache(maxsize=None)
+def _pythonize_name(base_name: str) -> str:
+    """CamelCase -> snake_case, the same base names show up across many structs"""
+    return _CAMEL_SPLIT_RE.sub(r"_\1", base_name).lower()
+
+
+def _collect_comment_blocks(lines: Iterable[str]) -> Dict[int, List[str]]:
+    """
+    Gather runs of comment lines in a single pass
+
+    Returns a dict of the index of the line directly following each
+    comment block to the de-marked lines of that block.
+    """
+    comment_blocks = {}
+    comment_lines = []
+    in_block = False
+    for lineno, line in enumerate(lines):
+        if _COMMENT_RE.match(line):
+            in_block = True
+            comment_line = line.strip()
+            if not comment_line.startswith("# "):
+                comment_line = "# " + comment_line[1:]
+            # Strip comment marker off
+            comment_line = comment_line.strip()[2:]
+            # Skip unnecessary comment about _fields_
+            if "_fields_" not in comment_line:
+                comment_lines.append(comment_line)
+        elif in_block:
+            comment_blocks[lineno] = comment_lines
+            comment_lines = []
+            in_block = False
+    return comment_blocks
+
+
+def scan_structs():
+    import pyassimp.structs as s
+    structs_ast, comment_blocks = _parse_source()
     struct_order = []
+    fields_assigns = []
+
+    def _on_class(ast_node: ast.ClassDef):
+        # Might be a Structure subclass
+        struct_order.append(sys.intern(ast_node.name))
+        for y in [n for n in ast_node.body if type(n) is ast.Assign]:
+            if y.targets[0].id == "_fields_":
+                fields_assigns.append((ast_node.name, y))
+
+    def _on_assign(ast_node: ast.Assign):
+        # Might be an assignment of `StructureSubclass._fields_`
+        first_targ = ast_node.targets[0]
+        if type(first_targ) is ast.Attribute and first_targ.attr == "_fields_":
+            name: ast.Name = first_targ.value
+            fields_assigns.append((name.id, ast_node))
+
+    node_handlers = {ast.ClassDef: _on_class, ast.Assign: _on_assign}
+    for ast_node in structs_ast.body:
+        handler = node_handlers.get(type(ast_node))
+        if handler:
+            handler(ast_node)
+
+    # All the struct names are known now, no need for defaultdicts.
+    field_locs = {name: {} for name in struct_order}
+    field_comments = {name: {} for name in struct_order}
+    struct_comments = {name: [] for name in struct_order}
+    # lineno -> number of fields declared on that line
+    struct_line_counts = {name: {} for name in struct_order}
 
-    def _process_fields(name, field_container):
+    for name, field_container in fields_assigns:
         l: ast.List = field_container.value
+        locs = field_locs.setdefault(name, {})
+        line_counts = struct_line_counts.setdefault(name, {})
         for o in l.elts:
             lineno = o.elts[0].lineno - 1
-            locs = field_locs[name]
             # Already have an assignment on this line,
             # first assignment should get any of the comments.
-            if lineno in locs.values():
-                continue
-            locs[o.elts[0].value] = lineno
+            if lineno not in line_counts:
+                locs[o.elts[0].value] = lineno
+            line_counts[lineno] = line_counts.get(lineno, 0) + 1
 
-    for ast_node in structs_ast.body:
-        # Might be a Structure subclass
-        if isinstance(ast_node, ast.ClassDef):
-            struct_order.append(ast_node.name)
-            for y in ast_node.body:
-                if not isinstance(y, ast.Assign):
-                    continue
-                if y.targets[0].id != "_fields_":
-                    continue
-                _process_fields(ast_node.name, y)
-        # Might be an assignment of `StructureSubclass._fields_`
-        if isinstance(ast_node, ast.Assign):
-            first_targ = ast_node.targets[0]
-            if not isinstance(first_targ, ast.Attribute):
-                continue
-            if first_targ.attr != "_fields_":
-                continue
-            name: ast.Name = first_targ.value
-            _process_fields(name.id, ast_node)
-
-    split_lines = source.splitlines(keepends=False)
     for clazz, fields in field_locs.items():
+        line_counts = struct_line_counts[clazz]
         for field_name, lineno in fields.items():
-            comment_lines = []
-            while re.match(r"^\s*#", split_lines[lineno - 1]):
-                comment_line = split_lines[lineno - 1].lstrip()
-                if not comment_line.startswith("# "):
-                    comment_line = re.sub(r"^#", "# ", comment_line)
-                # Strip comment marker off
-                comment_line = comment_line.strip()[2:]
-                # Skip unnecessary comment about _fields_
-                if "_fields_" not in comment_line:
-                    comment_lines.insert(0, comment_line)
-                lineno -= 1
-            field_comments[clazz][field_name] = comment_lines
+            comments = comment_blocks.get(lineno, [])
+            if line_counts[lineno] > 1:
+                # Comment describes a whole run of fields like `x, y, z`,
+                # that's really about the struct itself.
+                struct_comments[clazz].extend(comments)
+                comments = []
+            field_comments.setdefault(clazz, {})[field_name] = comments
 
+    struct_classes = {}
     for struct_cls_name in struct_order:
         cls = getattr(s, struct_cls_name)
-        fields = getattr(cls, "_fields_")
-        cls_doc = inspect.getdoc(cls)
+        struct_classes[struct_cls_name] = (cls, cls._fields_)
+
+    for struct_cls_name, (cls, fields) in struct_classes.items():
+        cls_doc = _cached_doc(cls)
 
         fields_type_data: Dict[str, FieldTypeData] = {}
         for field_name, field_type in fields:
-            split_name = field_type.__name__.split("_")
-            ptr_prefix = ""
-            builtin = False
-            while split_name[0] == "LP":
-                # LP_ classes are automatically generated pointer classes
-                ptr_prefix += "*"
-                split_name = split_name[1:]
-            python_type_name = None
-            if split_name[0] == "c":
-                # from ctypes proper
-                c_decl = split_name[1]
-                if c_decl.startswith("u"):
-                    c_decl = "unsigned " + c_decl[1:]
-                if c_decl.endswith("byte"):
-                    c_decl = c_decl.replace("byte", "char")
-                split_name = [c_decl] + split_name[2:]
-                while split_name[-1] == "p":
-                    # _p suffix _also_ makes this a pointer
-                    ptr_prefix += "*"
-                    split_name = split_name[:-1]
-                signless_type = c_decl.rpartition("unsigned ")[-1]
-                if signless_type in ("int", "long", "long long"):
-                    python_type_name = "int"
-                elif signless_type == "char" and not ptr_prefix:
-                    python_type_name = "int"
-                elif signless_type in ("float", "double"):
-                    python_type_name = "float"
-                builtin = True
-            else:
-                # Not from ctypes, must be a struct from assimp.
-                python_type_name = split_name[0]
-                split_name = ["struct ai" + split_name[0]] + split_name[1:]
-            suffix = ""
-            array_len = None
-            if len(split_name) > 1:
-                if split_name[1] == "Array":
-                    suffix = f"[{split_name[2]}]"
-                    array_len = int(split_name[2])
-                    split_name = [split_name[0]]
-                else:
-                    raise ValueError(split_name[1])
-            full_sig = f"{split_name[0]} {ptr_prefix}{field_name}{suffix}"
-            python_field_name = field_name
-            base_name = field_name
-            rewrite_name = False
-            if field_name.startswith("m") and field_name[1].upper() == field_name[1]:
-                base_name = field_name[1:]
-                rewrite_name = True
-            elif field_name == "achFormatHint":
-                rewrite_name = True
-            elif field_name == "pcData":
-                base_name = "data"
-                rewrite_name = True
-
-            if rewrite_name:
-                a = re.compile('((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))')
-                python_field_name = a.sub(r"_\1", base_name).lower()
-            fields_type_data[field_name] = FieldTypeData(
+            fields_type_data[field_name] = _make_field_data(
                 field_name,
-                base_name,
-                python_field_name,
-                full_sig,
-                ptr_prefix,
-                array_len,
-                python_type_name,
-                builtin,
-                field_comments[struct_cls_name].get(field_name, [])
+                field_type.__name__,
+                field_comments[struct_cls_name].get(field_name, []),
+            )
+        for field_name, type_name, comments in _EXTRA_FIELDS.get(struct_cls_name, ()):
+            if field_name not in fields_type_data:
+                fields_type_data[field_name] = _make_field_data(field_name, type_name, comments)
+        yield StructData(struct_cls_name, cls_doc, fields_type_data, struct_comments[struct_cls_name])
+
+        for extra_name, extra_doc, extra_comments, extra_fields in _EXTRA_STRUCTS.get(struct_cls_name, ()):
+            if extra_name in struct_classes:
+                continue
+            yield StructData(
+                sys.intern(extra_name),
+                extra_doc,
+                {f: _make_field_data(f, t, c) for f, t, c in extra_fields},
+                extra_comments,
             )
-        yield StructData(struct_cls_name, cls_doc, fields_type_data)
-
-
-def print_code():
-    print('# Generated by convert_pyassimp.py, do not edit manually!\n')
-    print("from __future__ import annotations\n\nfrom .structs_base import *\n\nC_SRC = \"\"\n\n")
-
-    for struct_data in scan_structs():
-        struct_cls_name = struct_data.name
-        fields_type_data = struct_data.fields
-        print("C_SRC += \"\"\"")
-        for doc_line in struct_data.doc.splitlines(keepends=False):
-            print(f"// {doc_line}".rstrip())
-        print(f"struct ai{struct_cls_name} {{")
-        for field in fields_type_data.values():
-            print(f"    {field.full_sig};")
-        print("};")
-        print("\"\"\"\n\n")
-        base_wrapper_cls = "SerializableStruct"
-        if struct_cls_name in TUPLE_STRUCTS:
-            base_wrapper_cls = "NumPyStruct"
-        elif struct_cls_name in SUPPORTS_MAPPING:
-            base_wrapper_cls = f"{struct_cls_name}Mapping"
-        print(f"class {struct_cls_name}({base_wrapper_cls}):")
-        print("    __slots__ = ()")
-        print(f"    C_TYPE = \"struct ai{struct_cls_name}\"")
-        if struct_cls_name in TUPLE_STRUCTS:
-            tuple_dets = TUPLE_STRUCTS[struct_cls_name]
-            print(f"    SHAPE = {tuple_dets[1]!r}")
-            print(f"    DTYPE = {tuple_dets[0]}")
-            num_elems = 1
-            for elem in tuple_dets[1]:
-                num_elems *= elem
-            print(f"    NUM_ELEMS = {num_elems}")
-        print("")
-        had_comment = False
-        for field_name, type_data in fields_type_data.items():
-            python_name = type_data.python_name
-            if field_name.startswith("mNum"):
-                if "m" + type_data.base_name[3:] in fields_type_data:
-                    # A count field that seems to have a directly associated collection
-                    # field. No point adding both to the API.
-                    continue
-
-            if had_comment:
-                print("")
-                had_comment = False
-            # Pythonize the field names
-            call_spec = ""
-            if python_name != type_data.name:
-                call_spec = f"name={field_name!r}"
-            type_sig = "Any"
-            accessor_name = "SimpleAccessor"
-            if type_data.python_type_name:
-                type_sig = type_data.python_type_name
-                if type_sig == struct_cls_name:
-                    type_sig = repr(type_sig)
-            adapter_name = type_data.python_type_name
-            if adapter_name == struct_cls_name:
-                adapter_name = f"LazyStruct(lambda: {adapter_name})"
-            if type_data.python_type_name == "String":
-                adapter_name = "StringAdapter"
-                type_sig = "str"
-            elif adapter_name in TUPLE_STRUCTS:
-                type_sig = "numpy.ndarray"
-
-            if type_data.builtin:
-                adapter_name = "None"
-            num_elem_field = None
-            accessor = None
-            if type_data.array_len:
-                type_sig = f"BaseSequence[{type_sig}]"
-                accessor = f"StaticSequenceAccessor({field_name!r}, {type_data.array_len}, {adapter_name})"
-            elif "mNum" + type_data.base_name in fields_type_data:
-                num_elem_field = "mNum" + type_data.base_name
-            elif struct_cls_name in ("Mesh", "AnimMesh"):
-                if field_name in ("mNormals", "mTangents", "mBitangents"):
-                    num_elem_field = "mNumVertices"
-            elif struct_cls_name == "Metadata":
-                if field_name in ("mKeys", "mValues"):
-                    num_elem_field = "mNumProperties"
-
-            if struct_cls_name == "Node" and field_name == "mMeshes":
-                # Will get picked up by the sequence type sig rewriter later
-                type_sig = "Mesh"
-                adapter_name = "MeshIndexAdapter"
-            elif struct_cls_name == "MaterialProperty" and field_name == "mIndex":
-                python_name = "texture"
-                type_sig = "Optional[Texture]"
-                adapter_name = "TextureIndexAdapter"
-            elif struct_cls_name == "Mesh" and field_name == "mMaterialIndex":
-                python_name = "material"
-                type_sig = "Material"
-                adapter_name = "MaterialIndexAdapter"
-            elif struct_cls_name == "Metadata":
-                if field_name == "mKeys":
-                    python_name = "meta_keys"
-                elif field_name == "mValues":
-                    python_name = "meta_values"
-
-            if num_elem_field:
-                type_sig = f"BaseSequence[{type_sig}]"
-                accessor = f"DynamicSequenceAccessor({field_name!r}, {num_elem_field!r}, {adapter_name})"
-            elif type_data.pointer_type:
-                type_sig = f"Optional[{type_sig}]"
-
-            if struct_cls_name == "Texture" and field_name == "achFormatHint":
-                type_sig = "str"
-                accessor = f"SimpleAccessor(name={field_name!r}, adapter=CStrAdapter({type_data.array_len}))"
-
-            if struct_cls_name == "Texture" and field_name == "pcData":
-                type_sig = "Union[bytearray, numpy.ndarray]"
-                accessor = "TextureDataAccessor()"
-            elif struct_cls_name in ("Mesh", "AnimMesh") and field_name in ("mTextureCoords", "mColors"):
-                # List of lists, so wrap again
-                type_sig = f"Sequence[{type_sig}]"
-                accessor = f"VertexPropSequenceAccessor({field_name!r}, {type_data.array_len}, {adapter_name})"
-            elif struct_cls_name == "MaterialProperty" and field_name == "mData":
-                type_sig = "Any"
-                accessor = "MaterialPropertyDataAccessor()"
-            elif struct_cls_name == "MetadataEntry" and field_name == "mData":
-                type_sig = "Any"
-                accessor = "MetadataEntryDataAccessor()"
-            elif struct_cls_name == "ExportDataBlob" and field_name == "data":
-                type_sig = "Union[bytearray]"
-                accessor = "BoundedBufferAccessor('data', 'size')"
-            elif struct_cls_name == "Mesh" and field_name == "mFaces":
-                type_sig = "BaseSequence[BaseSequence[int]]"
-                accessor = "DynamicSequenceAccessor('mFaces', 'mNumFaces', ProxyAdapter(Face, 'indices'))"
-            elif type_data.full_sig.startswith("struct ") or adapter_name != "None":
-                if call_spec:
-                    call_spec += ", "
-                call_spec += f"adapter={adapter_name}"
-
-            if accessor is None:
-                accessor = f"{accessor_name}({call_spec})"
-            print(f"    {python_name}: {type_sig} = {accessor}")
-
-            # Docstrings must _follow_ the attribute.
-            comment_lines = type_data.comments
-            if comment_lines:
-                had_comment = True
-                if len(comment_lines) == 1:
-                    print(f'    """{comment_lines[0]}"""')
-                else:
-                    print('    """')
-                    for comment_line in comment_lines:
-                        if comment_line.strip():
-                            print(f"    {comment_line}")
-                        else:
-                            print("")
-                    print('    """')
-        print("\n")
-    print("ffi.cdef(FUNCTION_DECLS + C_SRC)")
+
+
+def _make_field_data(field_name: str, type_name: str, comments: List[str]) -> FieldTypeData:
+    c_type, ptr_prefix, suffix, array_len, python_type_name, builtin = _resolve_ctype(type_name)
+    full_sig = f"{c_type} {ptr_prefix}{field_name}{suffix}"
+    python_field_name = field_name
+    base_name = field_name
+    rewrite_name = False
+    if field_name.startswith("m") and field_name[1].upper() == field_name[1]:
+        base_name = field_name[1:]
+        rewrite_name = True
+    elif field_name == "achFormatHint":
+        rewrite_name = True
+    elif field_name == "pcData":
+        base_name = "data"
+        rewrite_name = True
+
+    if rewrite_name:
+        python_field_name = _pythonize_name(base_name)
+    return FieldTypeData(
+        field_name,
+        base_name,
+        python_field_name,
+        full_sig,
+        ptr_prefix,
+        array_len,
+        python_type_name,
+        builtin,
+        comments,
+    )
+
+
+def _structs_to_json(structs: List[StructData]) -> list:
+    return [
+        [struct.name, struct.doc, [
+            [getattr(field, slot) for slot in FieldTypeData.__slots__]
+            for field in struct.fields.values()
+        ], struct.comments]
+        for struct in structs
+    ]
+
+
+def _structs_from_json(data: list) -> List[StructData]:
+    structs = []
+    for name, doc, fields, comments in data:
+        fields_type_data = {}
+        for field_vals in fields:
+            field = FieldTypeData(*field_vals)
+            # JSON won't keep these interned for us
+            if field.python_type_name:
+                field.python_type_name = sys.intern(field.python_type_name)
+            fields_type_data[field.name] = field
+        structs.append(StructData(sys.intern(name), doc, fields_type_data, comments))
+    return structs
+
+
+def _scan_structs_cached() -> List[StructData]:
+    """
+    Like scan_structs(), but results are cached on disk between runs
+
+    The cache is a single file under the repo's `.cache/` directory, keyed on the
+    contents of both PyAssimp's structs.py and this script so it's invalidated
+    whenever either of them changes. It's plain JSON rather than a pickle so that
+    a tampered cache file can't run arbitrary code.
+    """
+    import pyassimp.structs as s
+    hasher = hashlib.sha1()
+    for path in (s.__file__, __file__):
+        hasher.update(pathlib.Path(path).read_bytes())
+    cache_key = hasher.hexdigest()
+    cache_path = pathlib.Path(__file__).resolve().parent.parent / ".cache" / "convert_pyassimp.json"
+    if cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached["key"] == cache_key:
+                return _structs_from_json(cached["structs"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or malformed cache, just regenerate it.
+            pass
+    structs = list(scan_structs())
+    try:
+        cache_path.parent.mkdir(mode=0o700, exist_ok=True)
+        cache_path.write_text(json.dumps({"key": cache_key, "structs": _structs_to_json(structs)}))
+    except OSError:
+        pass
+    return structs
+
+
+def _emit_docstring(emit, comment_lines: List[str]):
+    if len(comment_lines) == 1:
+        emit(f'    """{comment_lines[0]}"""\n')
+    else:
+        emit('    """\n')
+        for comment_line in comment_lines:
+            if comment_line.strip():
+                emit(f"    {comment_line}\n")
+            else:
+                emit("\n")
+        emit('    """\n')
+
+
+def _render_struct(struct_data: StructData) -> str:
+    """Render the C declaration and wrapper class for a single struct"""
+    out: List[str] = []
+    emit = out.append
+    struct_cls_name = struct_data.name
+    fields_type_data = struct_data.fields
+    emit("C_SRC += \"\"\"\n")
+    emit("".join(f"// {doc_line}".rstrip() + "\n" for doc_line in struct_data.doc.splitlines(keepends=False)))
+    emit(f"struct ai{struct_cls_name} {{\n")
+    emit("".join(f"    {field.full_sig};\n" for field in fields_type_data.values()))
+    emit("};\n")
+    emit("\"\"\"\n\n\n")
+    tuple_dets = TUPLE_STRUCTS.get(struct_cls_name)
+    supports_mapping = struct_cls_name in SUPPORTS_MAPPING
+    base_wrapper_cls = "SerializableStruct"
+    if tuple_dets:
+        base_wrapper_cls = "NumPyStruct"
+    elif supports_mapping:
+        base_wrapper_cls = f"{struct_cls_name}Mapping"
+    class_doc = ""
+    if struct_data.comments:
+        class_doc = "".join(f'    """{line}"""\n' for line in struct_data.comments)
+    emit(_CLASS_HEADER_TMPL(name=struct_cls_name, base=base_wrapper_cls, doc=class_doc))
+    if tuple_dets:
+        emit(f"    SHAPE = {tuple_dets[1]!r}\n")
+        emit(f"    DTYPE = {tuple_dets[0]}\n")
+        num_elems = 1
+        for elem in tuple_dets[1]:
+            num_elems *= elem
+        emit(f"    NUM_ELEMS = {num_elems}\n")
+    emit(_CLASS_ATTRS.get(struct_cls_name, ""))
+    emit("\n")
+    had_comment = False
+    for field_name, type_data in fields_type_data.items():
+        python_name = type_data.python_name
+        if field_name.startswith("mNum"):
+            if "m" + type_data.base_name[3:] in fields_type_data:
+                # A count field that seems to have a directly associated collection
+                # field. No point adding both to the API.
+                continue
+
+        if had_comment:
+            emit("\n")
+            had_comment = False
+        # Pythonize the field names
+        call_spec_parts = []
+        if python_name != type_data.name:
+            call_spec_parts.append(f"name={field_name!r}")
+        type_sig = "Any"
+        accessor_name = "SimpleAccessor"
+        if type_data.python_type_name:
+            type_sig = type_data.python_type_name
+            if type_sig == struct_cls_name:
+                type_sig = repr(type_sig)
+        adapter_name = type_data.python_type_name
+        if adapter_name == struct_cls_name:
+            adapter_name = f"LazyStruct(lambda: {adapter_name})"
+        if type_data.python_type_name == "String":
+            adapter_name = "StringAdapter"
+            type_sig = "str"
+        elif adapter_name in TUPLE_STRUCTS:
+            type_sig = "numpy.ndarray"
+
+        if type_data.builtin:
+            adapter_name = "None"
+        num_elem_field = None
+        accessor = None
+        if type_data.array_len:
+            type_sig = f"BaseSequence[{type_sig}]"
+            accessor = f"StaticSequenceAccessor({field_name!r}, {type_data.array_len}, {adapter_name})"
+        elif "mNum" + type_data.base_name in fields_type_data:
+            num_elem_field = "mNum" + type_data.base_name
+        elif struct_cls_name in ("Mesh", "AnimMesh"):
+            if field_name in ("mNormals", "mTangents", "mBitangents"):
+                num_elem_field = "mNumVertices"
+        elif struct_cls_name == "Metadata":
+            if field_name in ("mKeys", "mValues"):
+                num_elem_field = "mNumProperties"
+        elif struct_cls_name == "MeshMorphKey":
+            if field_name in ("mValues", "mWeights"):
+                num_elem_field = "mNumValuesAndWeights"
+
+        if struct_cls_name == "Node" and field_name == "mMeshes":
+            # Will get picked up by the sequence type sig rewriter later
+            type_sig = "Mesh"
+            adapter_name = "MeshIndexAdapter"
+        elif struct_cls_name == "MaterialProperty" and field_name == "mIndex":
+            python_name = "texture"
+            type_sig = "Optional[Texture]"
+            adapter_name = "TextureIndexAdapter"
+        elif struct_cls_name == "Mesh" and field_name == "mMaterialIndex":
+            python_name = "material"
+            type_sig = "Material"
+            adapter_name = "MaterialIndexAdapter"
+        elif struct_cls_name == "Metadata":
+            if field_name == "mKeys":
+                python_name = "meta_keys"
+            elif field_name == "mValues":
+                python_name = "meta_values"
+
+        if num_elem_field:
+            type_sig = f"BaseSequence[{type_sig}]"
+            accessor = f"DynamicSequenceAccessor({field_name!r}, {num_elem_field!r}, {adapter_name})"
+        elif type_data.pointer_type:
+            type_sig = f"Optional[{type_sig}]"
+
+        special_accessor = _SPECIAL_ACCESSORS.get((struct_cls_name, field_name))
+        if special_accessor:
+            type_sig, accessor = special_accessor(type_data)
+        elif struct_cls_name in _VERTEX_PROP_STRUCTS and field_name in _VERTEX_PROP_FIELDS:
+            # One (num_vertices, N) array per set
+            type_sig = "Sequence[numpy.ndarray]"
+            accessor = f"VertexPropSequenceAccessor({field_name!r}, {type_data.array_len}, {adapter_name})"
+        elif type_data.full_sig.startswith("struct ") or adapter_name != "None":
+            call_spec_parts.append(f"adapter={adapter_name}")
+
+        if accessor is None:
+            accessor = f"{accessor_name}({', '.join(call_spec_parts)})"
+        emit(_FIELD_TMPL(py_name=python_name, type_sig=type_sig, accessor=accessor))
+
+        # Docstrings must _follow_ the attribute.
+        comment_lines = type_data.comments
+        if comment_lines:
+            had_comment = True
+            _emit_docstring(emit, comment_lines)
+
+        for extra_name, extra_type_sig, extra_accessor, extra_doc in _EXTRA_ACCESSORS.get(
+                (struct_cls_name, field_name), ()):
+            # Always set apart from the field they're derived from
+            emit("\n")
+            emit(_FIELD_TMPL(py_name=extra_name, type_sig=extra_type_sig, accessor=extra_accessor))
+            _emit_docstring(emit, extra_doc.splitlines())
+            had_comment = True
+    emit("\n\n")
+    return "".join(out)
+
+
+def print_code(out_path: Optional[str] = None):
+    """Generate the struct definitions, writing them to `out_path` or stdout"""
+    # Build the whole module up in memory and write it out in one go
+    # rather than doing a separate write for every line.
+    out: List[str] = []
+    emit = out.append
+    emit('# Generated by convert_pyassimp.py, do not edit manually!\n\n')
+    emit("from __future__ import annotations\n\nfrom .structs_base import *\n\nC_SRC = \"\"\n\n\n")
+
+    out.extend([_render_struct(struct_data) for struct_data in _scan_structs_cached()])
+    emit("ffi.cdef(FUNCTION_DECLS + C_SRC)\n")
+    text = "".join(out)
+    if out_path:
+        pathlib.Path(out_path).write_text(text)
+    else:
+        sys.stdout.write(text)
 
 
 if __name__ == "__main__":
-    print_code()
+    print_code(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,7 +1,8 @@
-from .core import load, export, export_blob, ImportedScene, CopiedScene
+from .core import load, load_direct, export, export_blob, ImportedScene, CopiedScene
 
 __all__ = [
     'load',
+    'load_direct',
     'export',
     'export_blob',
     'ImportedScene',
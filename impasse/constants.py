@@ -1,5 +1,9 @@
-import enum
-from typing import NamedTuple
+import functools
+import sys
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy
 
 AI_MAX_NUMBER_OF_TEXTURECOORDS = 0x8
 AI_MAX_NUMBER_OF_COLOR_SETS = 0x8
@@ -10,7 +14,184 @@ AI_MAX_VERTICES = 0x7fffffff
 AI_MAX_FACES = 0x7fffffff
 
 
-class SceneFlags(enum.IntFlag):
+class _FastEnumMeta(type):
+    """
+    Minimal metaclass for int-based enums where lookups need to be cheap
+
+    `enum`'s machinery is flexible, but calling an `IntEnum` class or combining
+    its members is surprisingly slow and allocates pseudo-members through a lot
+    of introspection. Members here are plain `int` subclass instances, and
+    value -> member lookups are a single dict lookup.
+    """
+    _member_map_: Dict[str, int]
+    _value_to_member_map_: Dict[int, int]
+    _member_names_: List[str]
+
+    def __new__(mcs, cls_name, bases, namespace):
+        member_defs = {k: v for k, v in namespace.items() if not k.startswith("_") and type(v) is int}
+        for k in member_defs:
+            del namespace[k]
+        cls = super().__new__(mcs, cls_name, bases, namespace)
+        cls._member_map_ = {}
+        cls._value_to_member_map_ = {}
+        cls._member_names_ = []
+        for name, value in member_defs.items():
+            member = cls._value_to_member_map_.get(value)
+            if member is None:
+                # Not an alias for an existing member
+                member = int.__new__(cls, value)
+                member._name_ = name
+                cls._value_to_member_map_[value] = member
+                cls._member_names_.append(name)
+            cls._member_map_[name] = member
+            setattr(cls, name, member)
+        return cls
+
+    def __call__(cls, value=0):
+        member = cls._value_to_member_map_.get(value)
+        if member is None:
+            return cls._missing_(value)
+        return member
+
+    def __iter__(cls):
+        return (cls._member_map_[name] for name in cls._member_names_)
+
+    def __len__(cls):
+        return len(cls._member_names_)
+
+    def __getitem__(cls, name: str):
+        return cls._member_map_[name]
+
+    def __repr__(cls):
+        return f"<enum {cls.__name__!r}>"
+
+
+class _FastIntEnum(int, metaclass=_FastEnumMeta):
+    """Drop-in for the parts of `enum.IntEnum` we use, minus the overhead"""
+    _name_ = None
+
+    @classmethod
+    def _missing_(cls, value):
+        raise ValueError(f"{value!r} is not a valid {cls.__name__}")
+
+    @property
+    def name(self) -> str:
+        return self._name_
+
+    @property
+    def value(self) -> int:
+        return int(self)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}.{self.name}: {int(self)}>"
+
+    def __str__(self):
+        return f"{self.__class__.__name__}.{self.name}"
+
+    def __reduce_ex__(self, protocol):
+        return self.__class__, (int(self),)
+
+
+@functools.lru_cache(maxsize=1024)
+def _make_composite_flag(cls, value: int):
+    """
+    Build a pseudo-member for a combination of flags
+
+    Any int is a valid flag combination, so these are kept in a bounded cache
+    rather than alongside the real members where they'd pile up forever.
+    """
+    return int.__new__(cls, value)
+
+
+class _FastIntFlag(_FastIntEnum):
+    """Drop-in for the parts of `enum.IntFlag` we use, minus the overhead"""
+    @classmethod
+    def _missing_(cls, value):
+        if not isinstance(value, int):
+            raise ValueError(f"{value!r} is not a valid {cls.__name__}")
+        return _make_composite_flag(cls, value)
+
+    @property
+    def name(self) -> str:
+        if self._name_ is None:
+            names = []
+            unknown = 0
+            by_value = self.__class__._value_to_member_map_
+            # Members are all single bits, so walk only the set bits
+            # rather than checking every member.
+            remaining = int(self)
+            while remaining:
+                low = remaining & -remaining
+                remaining ^= low
+                member = by_value.get(low)
+                if member is None:
+                    unknown |= low
+                else:
+                    names.append(member._name_)
+            if unknown:
+                names.append(hex(unknown))
+            elif not names:
+                names.append("0")
+            self._name_ = "|".join(names)
+        return self._name_
+
+    def __iter__(self) -> Iterator["_FastIntFlag"]:
+        """Iterate over the known flags set in this value"""
+        by_value = self.__class__._value_to_member_map_
+        remaining = int(self)
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            member = by_value.get(low)
+            if member is not None:
+                yield member
+
+    def __contains__(self, other: int) -> bool:
+        return (int(self) & int(other)) == int(other)
+
+    @staticmethod
+    def has(mask: int, flag: int) -> bool:
+        """
+        Whether all bits of `flag` are set in `mask`
+
+        Preferred over `flag in mask` in hot code since it never builds
+        a flag instance, and works with plain `int` masks as well.
+        """
+        flag = int(flag)
+        return (int(mask) & flag) == flag
+
+    @staticmethod
+    def any(mask: int, flag: int) -> bool:
+        """Whether any bits of `flag` are set in `mask`"""
+        return (int(mask) & int(flag)) != 0
+
+    def __or__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return self.__class__(int(self) | int(other))
+
+    def __and__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return self.__class__(int(self) & int(other))
+
+    def __xor__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return self.__class__(int(self) ^ int(other))
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        all_bits = 0
+        for member in self.__class__:
+            all_bits |= int(member)
+        return self.__class__(all_bits & ~int(self))
+
+
+class SceneFlags(_FastIntFlag):
     INCOMPLETE = 0x1
     VALIDATED = 0x2
     VALIDATION_WARNING = 0x4
@@ -19,7 +200,7 @@ class SceneFlags(enum.IntFlag):
     ALLOW_SHARED = 0x20
 
 
-class MetadataType(enum.IntEnum):
+class MetadataType(_FastIntEnum):
     BOOL = 0
     INT32 = 1
     UINT64 = 2
@@ -29,7 +210,7 @@ class MetadataType(enum.IntEnum):
     AIVECTOR3D = 6
 
 
-class MaterialPropertyType(enum.IntEnum):
+class MaterialPropertyType(_FastIntEnum):
     FLOAT = 1
     DOUBLE = 2
     AISTRING = 3
@@ -37,7 +218,7 @@ class MaterialPropertyType(enum.IntEnum):
     BINARY = 5
 
 
-class TextureSemantic(enum.IntEnum):
+class TextureSemantic(_FastIntEnum):
     # Dummy value.
     #
     #  No texture, but the value to be used as 'texture semantic'
@@ -128,8 +309,19 @@ class TextureSemantic(enum.IntEnum):
     #
     UNKNOWN = 0xC
 
+    @staticmethod
+    def from_int(value: int) -> "TextureSemantic":
+        """Cheaper `TextureSemantic(value)`, raising `ValueError` for values that aren't members"""
+        if 0 <= value < len(_TEXTURE_SEMANTIC_BY_VALUE):
+            return _TEXTURE_SEMANTIC_BY_VALUE[value]
+        return TextureSemantic(value)
+
+
+# Semantic values are contiguous, so a tuple index beats a dict lookup.
+_TEXTURE_SEMANTIC_BY_VALUE = tuple(TextureSemantic(i) for i in range(len(TextureSemantic)))
 
-class ProcessingStep(enum.IntFlag):
+
+class ProcessingStep(_FastIntFlag):
     # <hr>Calculates the tangents and bitangents for the imported meshes.
     #
     # Does nothing if a mesh does not have normals. You might want this post
@@ -364,6 +556,11 @@ class ProcessingStep(enum.IntFlag):
     #
     FixInfacingNormals = 0x2000
 
+    # <hr>Populates the armature and node fields on each bone, so the node
+    #  hierarchy of a skeleton can be walked from its bones.
+    #
+    PopulateArmatureData = 0x4000
+
     # <hr>This step splits meshes with more than one primitive type in
     #  homogeneous sub-meshes.
     #
@@ -563,15 +760,86 @@ class ProcessingStep(enum.IntFlag):
     #
     Debone = 0x4000000
 
-    GenEntityMeshes = 0x100000
-    OptimizeAnimations = 0x200000
-    FixTexturePaths = 0x200000
+    # <hr>This step will perform a global scale of the model.
+    #
+    #  Some importers are providing a mechanism to define a scaling unit for the
+    #  model. This post processing step can be used to do so. You need to get the
+    #  global scaling from your importer settings like in FBX. Use the flag
+    #  AI_CONFIG_GLOBAL_SCALE_FACTOR_KEY from the global property table to configure this.
+    #
+    #  Use <tt>#AI_CONFIG_GLOBAL_SCALE_FACTOR_KEY<tt> to setup the global scaling factor.
+    #
+    GlobalScale = 0x8000000
+
+    # <hr>A postprocessing step to embed of textures.
+    #
+    #  This will remove external data dependencies for textures.
+    #  If a texture's file does not exist at the specified path
+    #  (due, for instance, to an absolute path generated on another system),
+    #  it will check if a file with the same name exists at the root folder
+    #  of the imported model. And if so, it uses that.
+    #
     EmbedTextures = 0x10000000
 
+    # <hr>Forces (re)generation of normals, even if the mesh already has them.
+    #
+    ForceGenNormals = 0x20000000
+
+    # <hr>Drops normals for all faces of all meshes.
+    #
+    #  This is ignored if no normals are present.
+    #  Face normals are shared between all points of a single face,
+    #  so a single point can have multiple normals, which
+    #  forces the library to duplicate vertices in some cases.
+    #  #aiProcess_JoinIdenticalVertices is *senseless* then.
+    #  This process gives sense back to aiProcess_JoinIdenticalVertices
+    #
+    DropNormals = 0x40000000
+
+    # <hr>Generates an axis-aligned bounding box for each mesh, stored in
+    #  aiMesh::mAABB.
+    #
+    GenBoundingBoxes = 0x80000000
+
 
-class ProcessingPreset:
-    def __init__(self):
-        raise NotImplementedError()
+# `aiImportFile()` and friends take `unsigned int` flags
+PROCESSING_STEP_VALUES: numpy.ndarray = numpy.fromiter((int(x) for x in ProcessingStep), dtype=numpy.uint32)
+
+
+def any_flag(masks: numpy.ndarray, flag: int) -> numpy.ndarray:
+    """
+    Vectorized `ProcessingStep.any()` over an array of masks
+
+    >>> any_flag(numpy.array([0x8, 0x20], dtype=numpy.uint32), ProcessingStep.Triangulate)
+    array([ True, False])
+    """
+    return (masks & numpy.uint32(flag)) != 0
+
+
+class _FrozenNamespaceMeta(type):
+    def __setattr__(cls, key, value):
+        raise AttributeError(f"{cls.__name__} is read-only")
+
+    def __delattr__(cls, key):
+        raise AttributeError(f"{cls.__name__} is read-only")
+
+
+class _ConstantNamespace(metaclass=_FrozenNamespaceMeta):
+    """Read-only bag of constants, never instantiated"""
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Don't instantiate this")
+
+
+class ProcessingPreset(_ConstantNamespace):
+    """
+    Precomputed `ProcessingStep` combinations
+
+    Values are precomputed rather than built by OR-ing steps together at import.
+    tests.py checks that they still match the steps they're documented to contain.
+    """
+    __slots__ = ()
 
     # @def ConvertToLeftHanded
     #  @brief Shortcut flag for Direct3D-based applications.
@@ -583,12 +851,8 @@ class ProcessingPreset:
     #
     #  @deprecated
     #
-    ConvertToLeftHanded = (
-        0
-        | ProcessingStep.MakeLeftHanded
-        | ProcessingStep.FlipUVs
-        | ProcessingStep.FlipWindingOrder
-    )
+    # = MakeLeftHanded | FlipUVs | FlipWindingOrder
+    ConvertToLeftHanded = ProcessingStep(0x1800004)
 
     # @def TargetRealtimeUse_Fast
     #  @brief Default postprocess configuration optimizing the data for real-time rendering.
@@ -603,15 +867,9 @@ class ProcessingPreset:
     #  Some of them offer further configurable properties, while some of them might not be of
     #  use for you so it might be better to not specify them.
     #
-    TargetRealtime_Fast = (
-        0
-        | ProcessingStep.CalcTangentSpace
-        | ProcessingStep.GenNormals
-        | ProcessingStep.JoinIdenticalVertices
-        | ProcessingStep.Triangulate
-        | ProcessingStep.GenUVCoords
-        | ProcessingStep.SortByPType
-    )
+    # = CalcTangentSpace | GenNormals | JoinIdenticalVertices | Triangulate | GenUVCoords
+    #  | SortByPType
+    TargetRealtime_Fast = ProcessingStep(0x4802b)
 
     # @def TargetRealtime_Quality
     #  @brief Default postprocess configuration optimizing the data for real-time rendering.
@@ -628,21 +886,10 @@ class ProcessingPreset:
     #  Some of them offer further configurable properties, while some of them might not be
     #  of use for you so it might be better to not specify them.
     #
-    TargetRealtime_Quality = (
-        0
-        | ProcessingStep.CalcTangentSpace
-        | ProcessingStep.GenSmoothNormals
-        | ProcessingStep.JoinIdenticalVertices
-        | ProcessingStep.ImproveCacheLocality
-        | ProcessingStep.LimitBoneWeights
-        | ProcessingStep.RemoveRedundantMaterials
-        | ProcessingStep.SplitLargeMeshes
-        | ProcessingStep.Triangulate
-        | ProcessingStep.GenUVCoords
-        | ProcessingStep.SortByPType
-        | ProcessingStep.FindDegenerates
-        | ProcessingStep.FindInvalidData
-    )
+    # = CalcTangentSpace | GenSmoothNormals | JoinIdenticalVertices | ImproveCacheLocality
+    #  | LimitBoneWeights | RemoveRedundantMaterials | SplitLargeMeshes | Triangulate
+    #  | GenUVCoords | SortByPType | FindDegenerates | FindInvalidData
+    TargetRealtime_Quality = ProcessingStep(0x79acb)
 
     # @def TargetRealtime_MaxQuality
     #  @brief Default postprocess configuration optimizing the data for real-time rendering.
@@ -658,61 +905,62 @@ class ProcessingPreset:
     #  Some of them offer further configurable properties, while some of them might not be
     #  of use for you so it might be better to not specify them.
     #
-    TargetRealtime_MaxQuality = (
-        0
-        | TargetRealtime_Quality
-        | ProcessingStep.FindInstances
-        | ProcessingStep.ValidateDataStructure
-        | ProcessingStep.OptimizeMeshes
-    )
+    # = TargetRealtime_Quality | FindInstances | ValidateDataStructure | OptimizeMeshes
+    TargetRealtime_MaxQuality = ProcessingStep(0x379ecb)
 
 
-class MaterialPropertyTuple(NamedTuple):
-    name: str
-    semantic: int
+MaterialPropertyTuple = Tuple[str, int]
 
 
-class MaterialPropertyKey:
-    def __init__(self):
-        raise RuntimeError("Don't instantiate this")
+def _k(name: str, semantic: int = 0) -> MaterialPropertyTuple:
+    return sys.intern(name), semantic
+
+
+class MaterialPropertyKey(_ConstantNamespace):
+    __slots__ = ()
+
+    @staticmethod
+    def by_name(name: str) -> Optional[MaterialPropertyTuple]:
+        """Get the key constant for a raw property name like "?mat.name", if there is one"""
+        return _MATERIAL_KEY_BY_NAME.get(name)
 
     # https://github.com/assimp/assimp/blob/1d33131e902ff3f6b571ee3964c666698a99eb0f/include/assimp/material.h#L943
     # TODO: There should be some constants that also specify an index into
     #   the property's array after the semantic. Should add support for that.
-    NAME = MaterialPropertyTuple("?mat.name", 0)
-    TWOSIDED = MaterialPropertyTuple("$mat.twosided", 0)
-    SHADING_MODEL = MaterialPropertyTuple("$mat.shadingm", 0)
-    ENABLE_WIREFRAME = MaterialPropertyTuple("$mat.wireframe", 0)
-    BLEND_FUNC = MaterialPropertyTuple("$mat.blend", 0)
-    OPACITY = MaterialPropertyTuple("$mat.opacity", 0)
-    TRANSPARENCYFACTOR = MaterialPropertyTuple("$mat.transparencyfactor", 0)
-    BUMPSCALING = MaterialPropertyTuple("$mat.bumpscaling", 0)
-    SHININESS = MaterialPropertyTuple("$mat.shininess", 0)
-    REFLECTIVITY = MaterialPropertyTuple("$mat.reflectivity", 0)
-    SHININESS_STRENGTH = MaterialPropertyTuple("$mat.shinpercent", 0)
-    REFRACTI = MaterialPropertyTuple("$mat.refracti", 0)
-    COLOR_DIFFUSE = MaterialPropertyTuple("$clr.diffuse", 0)
-    COLOR_AMBIENT = MaterialPropertyTuple("$clr.ambient", 0)
-    COLOR_SPECULAR = MaterialPropertyTuple("$clr.specular", 0)
-    COLOR_EMISSIVE = MaterialPropertyTuple("$clr.emissive", 0)
-    COLOR_TRANSPARENT = MaterialPropertyTuple("$clr.transparent", 0)
-    COLOR_REFLECTIVE = MaterialPropertyTuple("$clr.reflective", 0)
-    GLOBAL_BACKGROUND_IMAGE = MaterialPropertyTuple("?bg.global", 0)
-    GLOBAL_SHADERLANG = MaterialPropertyTuple("?sh.lang", 0)
-    SHADER_VERTEX = MaterialPropertyTuple("?sh.vs", 0)
-    SHADER_FRAGMENT = MaterialPropertyTuple("?sh.fs", 0)
-    SHADER_GEO = MaterialPropertyTuple("?sh.gs", 0)
-    SHADER_TESSELATION = MaterialPropertyTuple("?sh.ts", 0)
-    SHADER_PRIMITIVE = MaterialPropertyTuple("?sh.ps", 0)
-    SHADER_COMPUTE = MaterialPropertyTuple("?sh.cs", 0)
-    BASE_COLOR = MaterialPropertyTuple("$clr.base", 0)
-    USE_METALLIC_MAP = MaterialPropertyTuple("$mat.useMetallicMap", 0)
+    NAME = _k("?mat.name")
+    TWOSIDED = _k("$mat.twosided")
+    SHADING_MODEL = _k("$mat.shadingm")
+    ENABLE_WIREFRAME = _k("$mat.wireframe")
+    BLEND_FUNC = _k("$mat.blend")
+    OPACITY = _k("$mat.opacity")
+    TRANSPARENCYFACTOR = _k("$mat.transparencyfactor")
+    BUMPSCALING = _k("$mat.bumpscaling")
+    SHININESS = _k("$mat.shininess")
+    REFLECTIVITY = _k("$mat.reflectivity")
+    SHININESS_STRENGTH = _k("$mat.shinpercent")
+    REFRACTI = _k("$mat.refracti")
+    COLOR_DIFFUSE = _k("$clr.diffuse")
+    COLOR_AMBIENT = _k("$clr.ambient")
+    COLOR_SPECULAR = _k("$clr.specular")
+    COLOR_EMISSIVE = _k("$clr.emissive")
+    COLOR_TRANSPARENT = _k("$clr.transparent")
+    COLOR_REFLECTIVE = _k("$clr.reflective")
+    GLOBAL_BACKGROUND_IMAGE = _k("?bg.global")
+    GLOBAL_SHADERLANG = _k("?sh.lang")
+    SHADER_VERTEX = _k("?sh.vs")
+    SHADER_FRAGMENT = _k("?sh.fs")
+    SHADER_GEO = _k("?sh.gs")
+    SHADER_TESSELATION = _k("?sh.ts")
+    SHADER_PRIMITIVE = _k("?sh.ps")
+    SHADER_COMPUTE = _k("?sh.cs")
+    BASE_COLOR = _k("$clr.base")
+    USE_METALLIC_MAP = _k("$mat.useMetallicMap")
     # Metallic factor. 0.0 = Full Dielectric, 1.0 = Full Metal
-    METALLIC_FACTOR = MaterialPropertyTuple("$mat.metallicFactor", 0)
+    METALLIC_FACTOR = _k("$mat.metallicFactor")
 
-    USE_ROUGHNESS_MAP = MaterialPropertyTuple("$mat.useRoughnessMap", 0)
+    USE_ROUGHNESS_MAP = _k("$mat.useRoughnessMap")
     # Roughness factor. 0.0 = Perfectly Smooth, 1.0 = Completely Rough
-    ROUGHNESS_FACTOR = MaterialPropertyTuple("$mat.roughnessFactor", 0)
+    ROUGHNESS_FACTOR = _k("$mat.roughnessFactor")
     # Specular/Glossiness Workflow
     # ---------------------------
     # Diffuse/Albedo Color. Note: Pure Metals have a diffuse of {0,0,0}
@@ -720,36 +968,36 @@ class MaterialPropertyKey:
     # Specular Color.
     # Note: Metallic/Roughness may also have a Specular Color
     # AI_MATKEY_COLOR_SPECULAR
-    SPECULAR_FACTOR = MaterialPropertyTuple("$mat.specularFactor", 0)
+    SPECULAR_FACTOR = _k("$mat.specularFactor")
     # Glossiness factor. 0.0 = Completely Rough, 1.0 = Perfectly Smooth
-    GLOSSINESS_FACTOR = MaterialPropertyTuple("$mat.glossinessFactor", 0)
+    GLOSSINESS_FACTOR = _k("$mat.glossinessFactor")
 
     # Sheen
     # -----
     # Sheen base RGB color. Default {0,0,0}
-    SHEEN_COLOR_FACTOR = MaterialPropertyTuple("$clr.sheen.factor", 0)
+    SHEEN_COLOR_FACTOR = _k("$clr.sheen.factor")
     # Sheen Roughness Factor.
-    SHEEN_ROUGHNESS_FACTOR = MaterialPropertyTuple("$mat.sheen.roughnessFactor", 0)
+    SHEEN_ROUGHNESS_FACTOR = _k("$mat.sheen.roughnessFactor")
 
     # Clearcoat
     # ---------
     # Clearcoat layer intensity. 0.0 = none (disabled)
-    CLEARCOAT_FACTOR = MaterialPropertyTuple("$mat.clearcoat.factor", 0)
-    CLEARCOAT_ROUGHNESS_FACTOR = MaterialPropertyTuple("$mat.clearcoat.roughnessFactor", 0)
+    CLEARCOAT_FACTOR = _k("$mat.clearcoat.factor")
+    CLEARCOAT_ROUGHNESS_FACTOR = _k("$mat.clearcoat.roughnessFactor")
 
     # Transmission
     # ------------
     # https:#github.com/KhronosGroup/glTF/tree/master/extensions/2.0/Khronos/KHR_materials_transmission
     # Base percentage of light transmitted through the surface. 0.0 = Opaque, 1.0 = Fully transparent
-    TRANSMISSION_FACTOR = MaterialPropertyTuple("$mat.transmission.factor", 0)
+    TRANSMISSION_FACTOR = _k("$mat.transmission.factor")
     # Texture defining percentage of light transmitted through the surface.
     # Multiplied by AI_MATKEY_TRANSMISSION_FACTOR
 
     # Emissive
     # --------
-    USE_EMISSIVE_MAP = MaterialPropertyTuple("$mat.useEmissiveMap", 0)
-    EMISSIVE_INTENSITY = MaterialPropertyTuple("$mat.emissiveIntensity", 0)
-    USE_AO_MAP = MaterialPropertyTuple("$mat.useAOMap", 0)
+    USE_EMISSIVE_MAP = _k("$mat.useEmissiveMap")
+    EMISSIVE_INTENSITY = _k("$mat.emissiveIntensity")
+    USE_AO_MAP = _k("$mat.useAOMap")
 
     TEXTURE = "$tex.file"
     UVWSRC = "$tex.uvwsrc"
@@ -761,3 +1009,9 @@ class MaterialPropertyKey:
     TEXMAP_AXIS = "$tex.mapaxis"
     UVTRANSFORM = "$tex.uvtrafo"
     TEXFLAGS = "$tex.flags"
+
+
+_MATERIAL_KEY_BY_NAME: Mapping[str, MaterialPropertyTuple] = MappingProxyType({
+    v[0]: v for v in vars(MaterialPropertyKey).values()
+    if isinstance(v, tuple) and len(v) == 2 and isinstance(v[0], str)
+})
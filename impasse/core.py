@@ -5,9 +5,14 @@ This is the main-module of Impasse.
 """
 from __future__ import annotations
 
+import contextlib
+import errno
+import functools
+import io
+import mmap
 import os
 import sys
-from typing import Optional, Union, BinaryIO, List
+from typing import Optional, Union, BinaryIO, List, Tuple
 import logging
 
 from . import helper
@@ -22,9 +27,49 @@ logger.addHandler(logging.NullHandler())
 
 
 _assimp_lib = helper.search_library()
+_FS_ENCODING = sys.getfilesystemencoding()
+
+
+@functools.lru_cache(maxsize=128)
+def _fs_encode(path: str) -> bytes:
+    return path.encode(_FS_ENCODING)
+
+
+@contextlib.contextmanager
+def _read_file_obj(file_obj: BinaryIO):
+    """
+    Get the remaining contents of `file_obj` as a buffer
+
+    Plain files read from the start get memory-mapped rather than read()
+    so a large model isn't copied into a `bytes` before assimp copies it again.
+    """
+    mapped = None
+    # Only plain files, wrappers like `gzip.GzipFile` have the fd of the underlying
+    # file but read() gives something else entirely.
+    if isinstance(file_obj, (io.FileIO, io.BufferedReader)):
+        try:
+            if file_obj.tell() == 0:
+                mapped = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # No fileno (a BufferedReader over BytesIO,) not mappable (pipes,) or an empty file.
+            pass
+
+    if mapped is None:
+        yield file_obj.read()
+        return
+
+    try:
+        with memoryview(mapped) as view:
+            # Leave the file where read() would have
+            file_obj.seek(0, os.SEEK_END)
+            yield view
+    finally:
+        mapped.close()
 
 
 class ImportedScene(Scene):
+    __slots__ = ()
+
     def __init__(self, struct_val):
         # Will be released after the last reference to this Scene object dies
         # If you want to force an early release you can just set `ImportedScene.struct = None`
@@ -47,6 +92,8 @@ class ImportedScene(Scene):
 
 
 class CopiedScene(Scene):
+    __slots__ = ()
+
     def __init__(self, struct_val):
         super().__init__(ffi.gc(struct_val, _assimp_lib.aiFreeScene))
         self._readonly = False
@@ -54,9 +101,17 @@ class CopiedScene(Scene):
 
 class OwnedExportDataBlob(ExportDataBlob):
     """Export Data Blob that's owned by Python."""
+    __slots__ = ()
+
     def __init__(self, struct_val):
         super().__init__(ffi.gc(struct_val, _assimp_lib.aiReleaseExportBlob))
 
+    def get_scene(self) -> OwnedExportDataBlob:
+        # assimp's API for blobs is a little funky. Rather than releasing blobs
+        # individually you only release the head of the list, so the rest of the
+        # chain holds a strong reference to the head like structs do their scene.
+        return self
+
 
 def load(
     file_or_name: Union[str, BinaryIO],
@@ -94,12 +149,107 @@ def load(
         #                                      const char* pHint)
         if file_type is None:
             raise AssimpError('File type must be specified when passing file objects!')
-        data = file_or_name.read()
-        model = _assimp_lib.aiImportFileFromMemory(
-            data, len(data), processing, file_type.encode())
+        with _read_file_obj(file_or_name) as data, ffi.from_buffer(data) as data_buf:
+            model = _assimp_lib.aiImportFileFromMemory(
+                data_buf, len(data), processing, file_type.encode())
     else:
         # a filename string has been passed
-        model = _assimp_lib.aiImportFile(file_or_name.encode(sys.getfilesystemencoding()), processing)
+        model = _assimp_lib.aiImportFile(_fs_encode(file_or_name), processing)
+
+    if not model:
+        raise AssimpError('Could not import file!')
+    return ImportedScene(model)
+
+
+# O_DIRECT wants buffers, offsets and sizes aligned to the logical block size,
+# the page size is a safe superset of that.
+_DIRECT_ALIGN = mmap.PAGESIZE
+_DIRECT_MIN_CHUNK = 64 * 1024
+_DIRECT_MAX_CHUNK = 16 * 1024 * 1024
+
+
+def _direct_chunk_size(size: int) -> int:
+    """Grow read sizes with the file, from 64KiB for small files up to 16MiB"""
+    chunk = _DIRECT_MIN_CHUNK
+    while chunk < _DIRECT_MAX_CHUNK and chunk * 16 < size:
+        chunk *= 2
+    return chunk
+
+
+def _read_fd_direct(fd: int) -> Optional[Tuple[mmap.mmap, int]]:
+    """Read all of an O_DIRECT fd into an aligned anonymous mapping, None if the FS won't allow it"""
+    size = os.fstat(fd).st_size
+    # Anonymous mappings are always page-aligned
+    buf = mmap.mmap(-1, max(-(-size // _DIRECT_ALIGN) * _DIRECT_ALIGN, _DIRECT_ALIGN))
+    chunk = _direct_chunk_size(size)
+    offset = 0
+    try:
+        with memoryview(buf) as view:
+            while offset < size:
+                with view[offset:offset + chunk] as chunk_view:
+                    read_len = os.preadv(fd, [chunk_view], offset)
+                if not read_len:
+                    break
+                offset += read_len
+    except OSError as e:
+        buf.close()
+        if e.errno == errno.EINVAL:
+            # Opening with O_DIRECT worked, but this FS doesn't actually support it.
+            return None
+        raise
+    return buf, offset
+
+
+@contextlib.contextmanager
+def _read_file_direct(filename: str):
+    """Get a file's contents as a buffer, bypassing the page cache where possible"""
+    direct_result = None
+    o_direct = getattr(os, "O_DIRECT", 0)
+    if o_direct:
+        try:
+            fd = os.open(filename, os.O_RDONLY | o_direct)
+        except OSError as e:
+            # tmpfs and friends refuse O_DIRECT outright
+            if e.errno != errno.EINVAL:
+                raise
+        else:
+            try:
+                direct_result = _read_fd_direct(fd)
+            finally:
+                os.close(fd)
+
+    if direct_result is None:
+        with open(filename, "rb") as f:
+            yield f.read()
+        return
+
+    buf, size = direct_result
+    try:
+        with memoryview(buf) as whole, whole[:size] as view:
+            yield view
+    finally:
+        buf.close()
+
+
+def load_direct(
+    filename: str,
+    file_type: Optional[str] = None,
+    processing=ProcessingStep.Triangulate,
+) -> ImportedScene:
+    """
+    Load a model, reading it with `O_DIRECT` to skip the page cache on Linux
+
+    Meant for batch jobs reading many cold files from fast storage, elsewhere
+    this behaves like a plain read. The model is imported from memory, so
+    only use this for formats that don't reference other files.
+
+    file_type defaults to the filename's extension.
+    """
+    if file_type is None:
+        file_type = os.path.splitext(filename)[1][1:]
+    with _read_file_direct(filename) as data, ffi.from_buffer(data) as data_buf:
+        model = _assimp_lib.aiImportFileFromMemory(
+            data_buf, len(data), processing, file_type.encode())
 
     if not model:
         raise AssimpError('Could not import file!')
@@ -132,7 +282,8 @@ def export(
     export_status = _assimp_lib.aiExportScene(
         scene.struct,
         file_type.encode("ascii"),
-        os.path.abspath(filename).encode(sys.getfilesystemencoding()),
+        # abspath() itself isn't memoized since its result depends on the cwd.
+        _fs_encode(os.path.abspath(filename)),
         processing,
     )
 
@@ -170,16 +321,15 @@ def export_blob(
 
     if not export_blob_ptr:
         raise AssimpError('Could not export scene to blob!')
-    # TODO: assimp's API for blobs is a little funky. Rather than releasing blobs
-    #  individually you only release the head of the list. That means we should
-    #  make sure the head doesn't die until the last child node has died.
-    #  Should maybe replace struct `scene` member with an `owner` member.
 
     # Convert the linked list to a regular list
     blob = OwnedExportDataBlob(export_blob_ptr)
     blob_list = [blob]
-    blob = blob.next
-    while blob is not None:
-        blob_list.append(blob.next)
-        blob = blob.next
+    # Follow the raw `next` pointers rather than `.next`, which would resolve the
+    # adapter and wrap every node twice.
+    next_ptr = export_blob_ptr.next
+    while next_ptr:
+        # The head owns the whole chain, see `OwnedExportDataBlob.get_scene()`
+        blob_list.append(ExportDataBlob(next_ptr, blob))
+        next_ptr = next_ptr.next
     return blob_list
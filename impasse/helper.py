@@ -2,55 +2,335 @@
 Some fancy helper functions.
 """
 
+import concurrent.futures
 import os
-import ctypes
-import operator
-from distutils.sysconfig import get_python_lib
+import functools
 import re
 import sys
+import sysconfig
+import threading
 import logging
+from typing import Dict, Iterator, Optional, Tuple
 
 import numpy
 
 from .errors import AssimpError
-from .structs import Node, Scene, ffi
+from .structs import Matrix4x4, Mesh, Node, Scene, Vector3D, VertexWeight, ffi
 
 logger = logging.getLogger("impasse")
 
+_CONDA_LIB_RE = re.compile(r'.*/lib/')
+# Matches things like `libassimp.so.5` and `libassimp.so.5.2.0`
+_VERSIONED_SO_RE = re.compile(r'\.so(\.\d+)+$')
 
-def transform(vector3, matrix4x4):
+
+_transform_scratch = threading.local()
+
+
+def transform(vector3, matrix4x4, out=None):
     """ Apply a transformation matrix on a 3D vector.
 
     :param vector3: array with 3 elements
     :param matrix4x4: 4x4 matrix
+    :param out: optional float64 array with 4 elements to write the result to
     """
-    return numpy.dot(matrix4x4, numpy.append(vector3, 1.))
+    # Reuse a per-thread homogeneous vector rather than `numpy.append()`ing a new one each call
+    scratch = getattr(_transform_scratch, "vec4", None)
+    if scratch is None:
+        scratch = _transform_scratch.vec4 = numpy.empty(4)
+    scratch[:3] = vector3
+    scratch[3] = 1.0
+    return numpy.dot(matrix4x4, scratch, out=out)
 
 
 def get_bounding_box(scene: Scene):
-    bb_min = [1e10, 1e10, 1e10]  # x,y,z
-    bb_max = [-1e10, -1e10, -1e10]  # x,y,z
+    bb_min = numpy.full(3, 1e10)  # x,y,z
+    bb_max = numpy.full(3, -1e10)  # x,y,z
     transformation = numpy.linalg.inv(scene.root_node.transformation)
     return get_bounding_box_for_node(scene, scene.root_node, bb_min, bb_max, transformation)
 
 
+# Picks min (False) or max (True) for each axis of each of a box's 8 corners
+_AABB_CORNER_SELECTORS = numpy.array(
+    [[x, y, z] for x in (False, True) for y in (False, True) for z in (False, True)]
+)
+
+
+def _mesh_aabb_corners(mesh: Mesh) -> Optional[numpy.ndarray]:
+    """Corners of the mesh's precomputed AABB as an (8, 3) array, if GenBoundingBoxes filled it in"""
+    aabb_buf = ffi.buffer(ffi.addressof(mesh.struct, "mAABB"), 2 * Vector3D.get_size())
+    aabb_min, aabb_max = numpy.frombuffer(aabb_buf, dtype=Vector3D.DTYPE).reshape((2, 3))
+    # An unpopulated AABB is all zeroes. Anything with no extent isn't worth special-casing anyway.
+    if (aabb_min == aabb_max).all() or (aabb_min > aabb_max).any():
+        return None
+    return numpy.where(_AABB_CORNER_SELECTORS, aabb_max, aabb_min)
+
+
+def _fold_transformed_bounds(vertices, transformation, bb_min, bb_max):
+    """Transform `vertices` by `transformation`, widening `bb_min` and `bb_max` in place"""
+    for i in range(vertices.shape[0]):
+        x = vertices[i, 0]
+        y = vertices[i, 1]
+        z = vertices[i, 2]
+        for axis in range(3):
+            val = (transformation[axis, 0] * x + transformation[axis, 1] * y
+                   + transformation[axis, 2] * z + transformation[axis, 3])
+            if val < bb_min[axis]:
+                bb_min[axis] = val
+            if val > bb_max[axis]:
+                bb_max[axis] = val
+
+
+@functools.lru_cache(maxsize=1)
+def _get_bounds_kernel():
+    """JIT `_fold_transformed_bounds()` if numba is installed, importing it lazily since it's slow to import"""
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True, nogil=True)(_fold_transformed_bounds)
+
+
 def get_bounding_box_for_node(scene: Scene, node: Node, bb_min, bb_max, transformation):
-    transformation = numpy.dot(transformation, node.transformation)
+    bounds_kernel = _get_bounds_kernel()
+    # Work on copies, the caller's arrays get updated at the end whichever path is taken.
+    # The kernel also updates these in place.
+    out_min, out_max = bb_min, bb_max
+    bb_min = numpy.array(bb_min, dtype=numpy.float64)
+    bb_max = numpy.array(bb_max, dtype=numpy.float64)
+
+    # Walk the graph with an explicit stack so deep hierarchies can't hit the recursion limit,
+    # and gather all transformed vertices so the min / max reductions only run once.
+    transformed_blocks = []
+    # Instanced meshes are referenced by many nodes, only look up their vertices once.
+    mesh_points: Dict[int, numpy.ndarray] = {}
+    stack = [(node, transformation)]
+    while stack:
+        node, parent_transformation = stack.pop()
+        node_transformation = numpy.dot(parent_transformation, node.transformation)
+
+        mesh_indices = list(node.struct.mMeshes[0:node.struct.mNumMeshes]) if node.struct.mMeshes else ()
+        if mesh_indices:
+            if bounds_kernel is not None:
+                kernel_transformation = numpy.ascontiguousarray(node_transformation, dtype=numpy.float64)
+            else:
+                # Stay in float32 like assimp's own data so BLAS can use SGEMM on half the bytes.
+                transformation_t = node_transformation.T.astype(numpy.float32)
+
+        for mesh_index in mesh_indices:
+            vertices = mesh_points.get(mesh_index)
+            if vertices is None:
+                mesh = scene.meshes[mesh_index]
+                # The transformed corners of a mesh's AABB bound all of its transformed vertices
+                # for any affine transform, so use those when assimp calculated the AABB for us.
+                vertices = _mesh_aabb_corners(mesh)
+                if vertices is None:
+                    vertices = mesh.vertices
+                mesh_points[mesh_index] = vertices
+            if not len(vertices):
+                continue
+            if bounds_kernel is not None:
+                bounds_kernel(vertices, kernel_transformation, bb_min, bb_max)
+                continue
+            # Transform all vertices with a single matmul over homogeneous coords.
+            homogeneous = numpy.empty((len(vertices), 4), dtype=numpy.float32)
+            homogeneous[:, :3] = vertices
+            homogeneous[:, 3] = 1.0
+            transformed_blocks.append((homogeneous @ transformation_t)[:, :3])
+
+        stack.extend((child, node_transformation) for child in node.children)
+
+    if transformed_blocks:
+        all_transformed = numpy.concatenate(transformed_blocks)
+        bb_min = numpy.minimum(bb_min, all_transformed.min(axis=0))
+        bb_max = numpy.maximum(bb_max, all_transformed.max(axis=0))
+    out_min[:] = bb_min.tolist()
+    out_max[:] = bb_max.tolist()
+    return out_min, out_max
+
+
+def _accumulate_face_normals(vertices, triangles, normals):
+    """Add each triangle's area-weighted normal to `normals` for each of its vertices"""
+    for i in range(triangles.shape[0]):
+        a = triangles[i, 0]
+        b = triangles[i, 1]
+        c = triangles[i, 2]
+        e1x = vertices[b, 0] - vertices[a, 0]
+        e1y = vertices[b, 1] - vertices[a, 1]
+        e1z = vertices[b, 2] - vertices[a, 2]
+        e2x = vertices[c, 0] - vertices[a, 0]
+        e2y = vertices[c, 1] - vertices[a, 1]
+        e2z = vertices[c, 2] - vertices[a, 2]
+        nx = e1y * e2z - e1z * e2y
+        ny = e1z * e2x - e1x * e2z
+        nz = e1x * e2y - e1y * e2x
+        for vert in (a, b, c):
+            normals[vert, 0] += nx
+            normals[vert, 1] += ny
+            normals[vert, 2] += nz
+
+
+@functools.lru_cache(maxsize=1)
+def _get_normals_kernel():
+    """JIT `_accumulate_face_normals()` if numba is installed"""
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True, nogil=True)(_accumulate_face_normals)
+
+
+def compute_vertex_normals(vertices: numpy.ndarray, triangles: numpy.ndarray) -> numpy.ndarray:
+    """
+    Calculate smooth per-vertex normals for a triangle mesh
+
+    Takes arrays like `Mesh.vertices` and `Mesh.triangles_array`, and returns a
+    `(num_vertices, 3)` array of unit normals, each the area-weighted average of the
+    normals of the triangles using that vertex. Vertices used by no triangle get zeroes.
+    """
+    vertices = numpy.ascontiguousarray(vertices, dtype=numpy.float32).reshape((-1, 3))
+    triangles = numpy.ascontiguousarray(triangles, dtype=numpy.uint32).reshape((-1, 3))
+    normals_kernel = _get_normals_kernel()
+    if normals_kernel is not None:
+        normals = numpy.zeros(vertices.shape, dtype=numpy.float32)
+        normals_kernel(vertices, triangles, normals)
+    else:
+        corners = vertices[triangles]
+        face_normals = numpy.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        # bincount sums duplicate indices, unlike fancy-indexed `+=`.
+        flat_indices = triangles.ravel()
+        normals = numpy.empty(vertices.shape, dtype=numpy.float32)
+        for axis in range(3):
+            normals[:, axis] = numpy.bincount(
+                flat_indices, weights=numpy.repeat(face_normals[:, axis], 3), minlength=len(vertices)
+            )
+    lengths = numpy.linalg.norm(normals, axis=1, keepdims=True)
+    numpy.divide(normals, lengths, out=normals, where=lengths > 0)
+    return normals
+
+
+def iter_face_indices(mesh: Mesh) -> Iterator[numpy.ndarray]:
+    """
+    Yield the indices of each of a mesh's faces as a uint32 array
+
+    Unlike `Mesh.triangles_array` this handles faces of any size, and is still much
+    faster than going through `Mesh.faces` since no per-face wrappers get made.
+    """
+    faces_ptr = mesh.struct.mFaces
+    num_faces = mesh.struct.mNumFaces if faces_ptr else 0
+    for i in range(num_faces):
+        face = faces_ptr[i]
+        # Copy, a view would have to keep the scene alive and that costs more than the copy.
+        indices_buf = ffi.buffer(face.mIndices, face.mNumIndices * 4)
+        yield numpy.frombuffer(indices_buf, dtype=numpy.uint32).copy()
+
+
+def get_face_indices(mesh: Mesh) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Gather the indices of all of a mesh's faces into flat arrays, whatever their sizes
+
+    Returns `(counts, indices)`, where `counts[i]` is the number of indices face `i` has
+    and `indices` holds every face's indices back to back. Use `Mesh.triangles_array`
+    instead if the mesh is known to be triangulated.
+    """
+    faces_ptr = mesh.struct.mFaces
+    num_faces = mesh.struct.mNumFaces if faces_ptr else 0
+    if not num_faces:
+        return numpy.empty(0, dtype=numpy.uint32), numpy.empty(0, dtype=numpy.uint32)
+    # `mNumIndices` is the first field of each `aiFace`, read them all at once.
+    face_size = ffi.sizeof("struct aiFace")
+    counts = numpy.frombuffer(
+        ffi.buffer(faces_ptr, num_faces * face_size), dtype=numpy.uint32
+    )[::face_size // 4].copy()
+    indices = numpy.empty(int(counts.sum()), dtype=numpy.uint32)
+    indices_ptr = ffi.from_buffer("unsigned int[]", indices)
+    offset = 0
+    for i in range(num_faces):
+        face = faces_ptr[i]
+        num_indices = face.mNumIndices
+        ffi.memmove(indices_ptr + offset, face.mIndices, num_indices * 4)
+        offset += num_indices
+    return counts, indices
+
+
+def get_bone_weights(mesh: Mesh):
+    """
+    Gather the weights of all of a mesh's bones into flat arrays
+
+    Returns `(vertex_ids, weights, offsets)`, where bone `i`'s weights are
+    `vertex_ids[offsets[i]:offsets[i + 1]]` and `weights[offsets[i]:offsets[i + 1]]`.
+    """
+    bone_weights = [bone.weights_array for bone in mesh.bones]
+    offsets = numpy.zeros(len(bone_weights) + 1, dtype=numpy.intp)
+    numpy.cumsum([len(w) for w in bone_weights], out=offsets[1:])
+    if bone_weights:
+        all_weights = numpy.concatenate(bone_weights)
+    else:
+        all_weights = numpy.empty(0, dtype=VertexWeight.DTYPE)
+    return (
+        numpy.ascontiguousarray(all_weights['vertex_id']),
+        numpy.ascontiguousarray(all_weights['weight']),
+        offsets,
+    )
 
-    for mesh in node.meshes:
-        for v in mesh.vertices:
-            v = transform(v, transformation)
-            bb_min[0] = min(bb_min[0], v[0])
-            bb_min[1] = min(bb_min[1], v[1])
-            bb_min[2] = min(bb_min[2], v[2])
-            bb_max[0] = max(bb_max[0], v[0])
-            bb_max[1] = max(bb_max[1], v[1])
-            bb_max[2] = max(bb_max[2], v[2])
 
-    for child in node.children:
-        bb_min, bb_max = get_bounding_box_for_node(scene, child, bb_min, bb_max, transformation)
+def get_bone_offset_matrices(mesh: Mesh) -> numpy.ndarray:
+    """
+    Copy the offset matrices of all of a mesh's bones into one `(num_bones, 4, 4)` array
 
-    return bb_min, bb_max
+    Suitable for skinning all bones with a single batched matmul.
+    """
+    bones_ptr = mesh.struct.mBones
+    num_bones = mesh.struct.mNumBones if bones_ptr else 0
+    out = numpy.empty((num_bones, 4, 4), dtype=Matrix4x4.DTYPE)
+    if not num_bones:
+        return out
+    out_ptr = ffi.from_buffer(out)
+    matrix_size = Matrix4x4.get_size()
+    for i in range(num_bones):
+        ffi.memmove(out_ptr + i * matrix_size, ffi.addressof(bones_ptr[i].mOffsetMatrix), matrix_size)
+    return out
+
+
+_CHANNEL_ATTR_RE = re.compile(r"(colors|texture_coords)(\d+)")
+
+
+def _vertex_attribute_array(mesh: Mesh, attr: str) -> numpy.ndarray:
+    channel_match = _CHANNEL_ATTR_RE.fullmatch(attr)
+    if channel_match:
+        channel_attr, channel = channel_match.group(1), int(channel_match.group(2))
+        channels = getattr(mesh, channel_attr)
+        arr = channels[channel] if channel < len(channels) else None
+        if arr is not None and channel_attr == "texture_coords":
+            # Only pass along the components actually used, usually just UV.
+            arr = arr[:, :mesh.num_uv_components[channel]]
+    elif attr in ("vertices", "normals", "tangents", "bitangents"):
+        arr = getattr(mesh, attr)
+    else:
+        raise ValueError(f"Unknown vertex attribute {attr!r}")
+    if arr is None or len(arr) != mesh.struct.mNumVertices:
+        raise ValueError(f"Mesh has no {attr!r}")
+    return arr
+
+
+def get_interleaved_vertices(mesh: Mesh, attributes=("vertices", "normals", "texture_coords0")) -> numpy.ndarray:
+    """
+    Pack several of a mesh's per-vertex attributes into one `(num_vertices, stride)` float32 array
+
+    Each row holds one vertex's attributes back to back in the order given, ready for
+    upload as an interleaved vertex buffer. Valid attributes are "vertices", "normals",
+    "tangents", "bitangents", "colorsN" and "texture_coordsN" for channel N. Positions,
+    normals and such take 3 floats, colors 4, and texture coords however many of
+    `mesh.num_uv_components` the channel uses. So the defaults give an 8 float stride with
+    normals at offset 3 and UVs at offset 6. Raises ValueError if the mesh lacks one.
+    """
+    arrays = [_vertex_attribute_array(mesh, attr) for attr in attributes]
+    out = numpy.empty((mesh.struct.mNumVertices, sum(arr.shape[1] for arr in arrays)), dtype=numpy.float32)
+    offset = 0
+    for arr in arrays:
+        out[:, offset:offset + arr.shape[1]] = arr
+        offset += arr.shape[1]
+    return out
 
 
 def _try_load_functions(dll):
@@ -58,7 +338,7 @@ def _try_load_functions(dll):
     Try to bind to aiImportFile and aiReleaseImport
 
     library_path: path to current lib
-    dll:          ctypes handle to library
+    dll:          cffi handle to library
     """
 
     try:
@@ -89,17 +369,15 @@ def get_search_config():
             additional_dirs.extend([item for item in os.environ['LD_LIBRARY_PATH'].split(':') if item])
 
         # check if running from anaconda.
-        anaconda_keywords = ("conda", "continuum")
-        if any(k in sys.version.lower() for k in anaconda_keywords):
-            cur_path = get_python_lib()
-            pattern = re.compile(r'.*/lib/')
-            conda_lib = pattern.match(cur_path).group()
-            logger.info("Adding Anaconda lib path:" + conda_lib)
-            additional_dirs.append(conda_lib)
-
-        # note - this won't catch libassimp.so.N.n, but
-        # currently there's always a symlink called
-        # libassimp.so in /usr/local/lib.
+        version = sys.version.lower()
+        if "conda" in version or "continuum" in version:
+            conda_lib_match = _CONDA_LIB_RE.match(sysconfig.get_paths()["purelib"])
+            if conda_lib_match:
+                conda_lib = conda_lib_match.group()
+                logger.info("Adding Anaconda lib path:" + conda_lib)
+                additional_dirs.append(conda_lib)
+
+        # versioned names like libassimp.so.N.n are matched too.
         ext_whitelist.append('.so')
         # libassimp.dylib in /usr/local/lib
         ext_whitelist.append('.dylib')
@@ -111,61 +389,93 @@ def get_search_config():
     return additional_dirs, ext_whitelist
 
 
+def _probe_library(library_path: str):
+    """Returns `(library_path, dll)` if `library_path` is a usable assimp library"""
+    logger.debug('Try ' + library_path)
+    try:
+        dll = ffi.dlopen(library_path)
+    except Exception as e:
+        logger.warning(str(e))
+        # OK, this except is evil. But different OSs will throw different
+        # errors. So just ignore any errors.
+        return None
+    # see if the functions we need are in the dll
+    if _try_load_functions(dll):
+        return library_path, dll
+    return None
+
+
+@functools.lru_cache(maxsize=1)
 def search_library():
     """
     Loads the assimp library.
     Throws exception AssimpError if no library_path is found
 
-    Returns: tuple, (load from filename function,
-                     load from memory function,
-                     export to filename function,
-                     export to blob function,
-                     release function,
-                     dll)
+    Set `IMPASSE_LIBRARY_PATH` to the path of the library to skip the search
+    entirely. The result is cached, so the search only happens once per process.
+
+    Returns: the cffi handle for the library
     """
+    env_path = os.environ.get("IMPASSE_LIBRARY_PATH")
+    if env_path:
+        try:
+            dll = ffi.dlopen(env_path)
+        except Exception as e:
+            raise AssimpError(f"Couldn't load IMPASSE_LIBRARY_PATH {env_path!r}: {e}") from e
+        if not _try_load_functions(dll):
+            raise AssimpError(f"IMPASSE_LIBRARY_PATH {env_path!r} is not an assimp library")
+        logger.debug('Using assimp library located at ' + env_path)
+        return dll
+
     folder = os.path.dirname(__file__)
     additional_dirs, ext_whitelist = get_search_config()
 
-    # silence 'DLL not found' message boxes on win
-    try:
+    if sys.platform == "win32":
+        # Only needed here, no sense importing it everywhere else.
+        import ctypes
+        # silence 'DLL not found' message boxes on win
         ctypes.windll.kernel32.SetErrorMode(0x8007)
-    except AttributeError:
-        pass
 
-    candidates = []
-    # test every file
+    ext_suffixes = tuple(ext_whitelist)
+    allow_versioned_so = '.so' in ext_suffixes
+    library_paths = []
+    # find every file that could plausibly be assimp
     for curfolder in [folder] + additional_dirs:
-        if os.path.isdir(curfolder):
-            for filename in os.listdir(curfolder):
-                # our minimum requirement for candidates is that
-                # they should contain 'assimp' somewhere in
-                # their name
-                if filename.lower().find('assimp') == -1:
+        try:
+            # scandir() entries already know their names and types, no extra stat() needed.
+            entries = list(os.scandir(curfolder))
+        except OSError:
+            continue
+        for entry in entries:
+            filename = entry.name
+            lower_name = filename.lower()
+            # our minimum requirement for candidates is that
+            # they should contain 'assimp' somewhere in
+            # their name
+            if 'assimp' not in lower_name:
+                continue
+
+            # Not a whitelisted extension
+            if not lower_name.endswith(ext_suffixes):
+                if not (allow_versioned_so and _VERSIONED_SO_RE.search(lower_name)):
                     continue
 
-                # Not a whitelisted extension
-                if not any(ext in filename.lower() for ext in ext_whitelist):
-                    continue
+            if not entry.is_file():
+                continue
 
-                library_path = os.path.join(curfolder, filename)
-                logger.debug('Try ' + library_path)
-                try:
-                    dll = ffi.dlopen(library_path)
-                except Exception as e:
-                    logger.warning(str(e))
-                    # OK, this except is evil. But different OSs will throw different
-                    # errors. So just ignore any errors.
-                    continue
-                # see if the functions we need are in the dll
-                if _try_load_functions(dll):
-                    candidates.append((library_path, dll))
+            library_paths.append(os.path.join(curfolder, filename))
+
+    candidates = []
+    if library_paths:
+        # Most of a dlopen() is spent in the dynamic linker, so probe concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(library_paths))) as executor:
+            candidates = [c for c in executor.map(_probe_library, library_paths) if c is not None]
 
     if not candidates:
         # no library found
         raise AssimpError("assimp library not found")
     else:
         # get the newest library_path
-        candidates = map(lambda x: (os.lstat(x[0])[-2], x), candidates)
-        res = max(candidates, key=operator.itemgetter(0))[1]
+        res = max(candidates, key=lambda c: os.lstat(c[0]).st_mtime)
         logger.debug('Using assimp library located at ' + res[0])
         return res[1]
@@ -1,3 +1,5 @@
+# Generated by convert_pyassimp.py, do not edit manually!
+
 from __future__ import annotations
 
 from .structs_base import *
@@ -177,7 +179,10 @@ class String(SerializableStruct):
     """
 
     data: BaseSequence[int] = StaticSequenceAccessor('data', 1024, None)
-    """String buffer. Size limit is MAXLEN (1024)"""
+    """String buffer. Size limit is MAXLEN"""
+
+    value: str = StringValueAccessor()
+    """`data` decoded as UTF-8, without going through it byte by byte"""
 
 
 C_SRC += """
@@ -206,6 +211,9 @@ class MaterialPropertyString(SerializableStruct):
     data: BaseSequence[int] = StaticSequenceAccessor('data', 1024, None)
     """String buffer. Size limit is MAXLEN"""
 
+    value: str = StringValueAccessor()
+    """`data` decoded as UTF-8, without going through it byte by byte"""
+
 
 C_SRC += """
 // See 'types.h' for details.
@@ -264,7 +272,6 @@ struct aiQuaternion {
 
 class Quaternion(NumPyStruct):
     """ w,x,y,z components of the quaternion"""
-
     __slots__ = ()
     C_TYPE = "struct aiQuaternion"
     SHAPE = (4,)
@@ -293,6 +300,9 @@ class Face(SerializableStruct):
     indices: BaseSequence[int] = DynamicSequenceAccessor('mIndices', 'mNumIndices', None)
     """ Pointer to the indices array. Size of the array is given in numIndices."""
 
+    indices_array: numpy.ndarray = ContiguousVecAccessor('mIndices', 'mNumIndices', numpy.dtype(numpy.uint32))
+    """`indices` as a zero-copy uint32 array"""
+
 
 C_SRC += """
 // See 'mesh.h' for details.
@@ -306,6 +316,8 @@ struct aiVertexWeight {
 class VertexWeight(SerializableStruct):
     __slots__ = ()
     C_TYPE = "struct aiVertexWeight"
+    # Matches the struct's layout, for reading whole arrays of weights at once
+    DTYPE: ClassVar[numpy.dtype] = numpy.dtype([('vertex_id', numpy.uint32), ('weight', numpy.float32)])
 
     vertex_id: int = SimpleAccessor(name='mVertexId')
     """ Index of the vertex which is influenced by the bone."""
@@ -399,6 +411,13 @@ struct aiMeshKey {
 class MeshKey(SerializableStruct):
     __slots__ = ()
     C_TYPE = "struct aiMeshKey"
+    # Matches the struct's layout, including the padding after the index
+    DTYPE: ClassVar[numpy.dtype] = numpy.dtype({
+        'names': ['time', 'value'],
+        'formats': [numpy.float64, numpy.uint32],
+        'offsets': [0, 8],
+        'itemsize': 16,
+    })
 
     time: float = SimpleAccessor(name='mTime')
     """The time of this key"""
@@ -452,13 +471,13 @@ class Metadata(MetadataMapping):
 
     meta_keys: BaseSequence[str] = DynamicSequenceAccessor('mKeys', 'mNumProperties', StringAdapter)
     """
-    Array of keys, may not be NULL. Entries in this array may not be NULL
+    Arrays of keys, may not be NULL. Entries in this array may not be NULL
     as well.
     """
 
     meta_values: BaseSequence[MetadataEntry] = DynamicSequenceAccessor('mValues', 'mNumProperties', MetadataEntry)
     """
-    Array of values, may not be NULL. Entries in this array may be NULL
+    Arrays of values, may not be NULL. Entries in this array may be NULL
     if the corresponding property key has no assigned value.
     """
 
@@ -764,6 +783,24 @@ class Ray(SerializableStruct):
     dir: numpy.ndarray = SimpleAccessor(adapter=Vector3D)
 
 
+C_SRC += """
+// See 'aabb.h' for details.
+struct aiAABB {
+    struct aiVector3D mMin;
+    struct aiVector3D mMax;
+};
+"""
+
+
+class AABB(SerializableStruct):
+    """ Axis-aligned bounding box"""
+    __slots__ = ()
+    C_TYPE = "struct aiAABB"
+
+    min: numpy.ndarray = SimpleAccessor(name='mMin', adapter=Vector3D)
+    max: numpy.ndarray = SimpleAccessor(name='mMax', adapter=Vector3D)
+
+
 C_SRC += """
 // See 'material.h' for details.
 struct aiUVTransform {
@@ -900,6 +937,9 @@ class Bone(SerializableStruct):
     weights: BaseSequence[VertexWeight] = DynamicSequenceAccessor('mWeights', 'mNumWeights', VertexWeight)
     """ The vertices affected by this bone"""
 
+    weights_array: numpy.ndarray = ContiguousVecAccessor('mWeights', 'mNumWeights', VertexWeight.DTYPE)
+    """`weights` as a zero-copy structured array with `vertex_id` and `weight` fields"""
+
     offset_matrix: numpy.ndarray = SimpleAccessor(name='mOffsetMatrix', adapter=Matrix4x4)
     """ Matrix that transforms from mesh space to bone space in bind pose"""
 
@@ -927,7 +967,7 @@ class AnimMesh(SerializableStruct):
     name: str = SimpleAccessor(name='mName', adapter=StringAdapter)
     """ Anim Mesh name"""
 
-    vertices: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mVertices', 'mNumVertices', Vector3D)
+    vertices: numpy.ndarray = ContiguousVecAccessor('mVertices', 'mNumVertices', Vector3D)
     """
     Replacement for aiMesh::mVertices. If this array is non-NULL,
     it *must* contain mNumVertices entries. The corresponding
@@ -937,19 +977,31 @@ class AnimMesh(SerializableStruct):
     array is not, the source data is taken instead)
     """
 
-    normals: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mNormals', 'mNumVertices', Vector3D)
+    vertices_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mVertices', 'mNumVertices', Vector3D)
+    """`vertices` as a sequence of per-vertex arrays, as it used to be"""
+
+    normals: numpy.ndarray = ContiguousVecAccessor('mNormals', 'mNumVertices', Vector3D)
     """Replacement for aiMesh::mNormals."""
 
-    tangents: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mTangents', 'mNumVertices', Vector3D)
+    normals_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mNormals', 'mNumVertices', Vector3D)
+    """`normals` as a sequence of per-vertex arrays, as it used to be"""
+
+    tangents: numpy.ndarray = ContiguousVecAccessor('mTangents', 'mNumVertices', Vector3D)
     """Replacement for aiMesh::mTangents."""
 
-    bitangents: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mBitangents', 'mNumVertices', Vector3D)
+    tangents_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mTangents', 'mNumVertices', Vector3D)
+    """`tangents` as a sequence of per-vertex arrays, as it used to be"""
+
+    bitangents: numpy.ndarray = ContiguousVecAccessor('mBitangents', 'mNumVertices', Vector3D)
     """Replacement for aiMesh::mBitangents."""
 
-    colors: Sequence[Optional[BaseSequence[numpy.ndarray]]] = VertexPropSequenceAccessor('mColors', 8, Color4D)
+    bitangents_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mBitangents', 'mNumVertices', Vector3D)
+    """`bitangents` as a sequence of per-vertex arrays, as it used to be"""
+
+    colors: Sequence[numpy.ndarray] = VertexPropSequenceAccessor('mColors', 8, Color4D)
     """Replacement for aiMesh::mColors"""
 
-    texture_coords: Sequence[Optional[BaseSequence[numpy.ndarray]]] = VertexPropSequenceAccessor('mTextureCoords', 8, Vector3D)
+    texture_coords: Sequence[numpy.ndarray] = VertexPropSequenceAccessor('mTextureCoords', 8, Vector3D)
     """Replacement for aiMesh::mTextureCoords"""
 
     weight: float = SimpleAccessor(name='mWeight')
@@ -977,6 +1029,7 @@ struct aiMesh {
     unsigned int mNumAnimMeshes;
     struct aiAnimMesh **mAnimMeshes;
     unsigned int mMethod;
+    struct aiAABB mAABB;
 };
 """
 
@@ -987,20 +1040,23 @@ class Mesh(SerializableStruct):
 
     primitive_types: int = SimpleAccessor(name='mPrimitiveTypes')
     """
-    Flags field with values from aiPrimitiveType enum.
+    aiPrimitiveType enum.
     This specifies which types of primitives are present in the mesh.
     The "SortByPrimitiveType"-Step can be used to make sure the
     output meshes consist of one primitive type each.
     """
 
-    vertices: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mVertices', 'mNumVertices', Vector3D)
+    vertices: numpy.ndarray = ContiguousVecAccessor('mVertices', 'mNumVertices', Vector3D)
     """
     Vertex positions.
     This array is always present in a mesh. The array is
     mNumVertices in size.
     """
 
-    normals: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mNormals', 'mNumVertices', Vector3D)
+    vertices_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mVertices', 'mNumVertices', Vector3D)
+    """`vertices` as a sequence of per-vertex arrays, as it used to be"""
+
+    normals: numpy.ndarray = ContiguousVecAccessor('mNormals', 'mNumVertices', Vector3D)
     """
     Vertex normals.
     The array contains normalized vectors, NULL if not present.
@@ -1023,7 +1079,10 @@ class Mesh(SerializableStruct):
       directly from the model file.
     """
 
-    tangents: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mTangents', 'mNumVertices', Vector3D)
+    normals_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mNormals', 'mNumVertices', Vector3D)
+    """`normals` as a sequence of per-vertex arrays, as it used to be"""
+
+    tangents: numpy.ndarray = ContiguousVecAccessor('mTangents', 'mNumVertices', Vector3D)
     """
     Vertex tangents.
     The tangent of a vertex points in the direction of the positive
@@ -1040,7 +1099,10 @@ class Mesh(SerializableStruct):
     tangent and normal vectors).
     """
 
-    bitangents: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mBitangents', 'mNumVertices', Vector3D)
+    tangents_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mTangents', 'mNumVertices', Vector3D)
+    """`tangents` as a sequence of per-vertex arrays, as it used to be"""
+
+    bitangents: numpy.ndarray = ContiguousVecAccessor('mBitangents', 'mNumVertices', Vector3D)
     """
     Vertex bitangents.
     The bitangent of a vertex points in the direction of the positive
@@ -1050,7 +1112,10 @@ class Mesh(SerializableStruct):
     bitangents.
     """
 
-    colors: Sequence[Optional[BaseSequence[numpy.ndarray]]] = VertexPropSequenceAccessor('mColors', 8, Color4D)
+    bitangents_iter: BaseSequence[numpy.ndarray] = DynamicSequenceAccessor('mBitangents', 'mNumVertices', Vector3D)
+    """`bitangents` as a sequence of per-vertex arrays, as it used to be"""
+
+    colors: Sequence[numpy.ndarray] = VertexPropSequenceAccessor('mColors', 8, Color4D)
     """
     Vertex color sets.
     A mesh may contain 0 to
@@ -1059,7 +1124,7 @@ class Mesh(SerializableStruct):
     mNumVertices in size if present.
     """
 
-    texture_coords: Sequence[Optional[BaseSequence[numpy.ndarray]]] = VertexPropSequenceAccessor('mTextureCoords', 8, Vector3D)
+    texture_coords: Sequence[numpy.ndarray] = VertexPropSequenceAccessor('mTextureCoords', 8, Vector3D)
     """
     Vertex texture coords, also known as UV channels.
     A mesh may contain 0 to AI_MAX_NUMBER_OF_TEXTURECOORDS per
@@ -1086,6 +1151,12 @@ class Mesh(SerializableStruct):
     is NOT set each face references an unique set of vertices.
     """
 
+    triangles_array: Optional[numpy.ndarray] = TriangleIndicesAccessor('mFaces')
+    """
+    The indices of all faces as a single (mNumFaces, 3) uint32 array.
+    None unless all faces are triangles, as after the Triangulate step.
+    """
+
     bones: BaseSequence[Bone] = DynamicSequenceAccessor('mBones', 'mNumBones', Bone)
     """
     The bones of this mesh.
@@ -1120,12 +1191,20 @@ class Mesh(SerializableStruct):
     Attachment meshes for this mesh, for vertex-based animation.
     Attachment meshes carry replacement data for some of the
     mesh'es vertex components (usually positions, normals).
-    Note! Currently only works with Collada loader.
+    Currently known to work with loaders:
+     - Collada
+     - gltf
     """
 
     method: int = SimpleAccessor(name='mMethod')
     """Method of morphing when animeshes are specified."""
 
+    aabb: AABB = SimpleAccessor(name='mAABB', adapter=AABB)
+    """
+    The bounding box of the mesh's vertices. Only filled in if
+    the GenBoundingBoxes postprocessing step was used, all zeroes otherwise.
+    """
+
 
 C_SRC += """
 // See 'camera.h' for details.
@@ -1227,6 +1306,13 @@ struct aiVectorKey {
 class VectorKey(SerializableStruct):
     __slots__ = ()
     C_TYPE = "struct aiVectorKey"
+    # Matches the struct's layout, including the padding after the vector
+    DTYPE: ClassVar[numpy.dtype] = numpy.dtype({
+        'names': ['time', 'value'],
+        'formats': [numpy.float64, (numpy.float32, 3)],
+        'offsets': [0, 8],
+        'itemsize': 24,
+    })
 
     time: float = SimpleAccessor(name='mTime')
     """The time of this key"""
@@ -1247,6 +1333,8 @@ struct aiQuatKey {
 class QuatKey(SerializableStruct):
     __slots__ = ()
     C_TYPE = "struct aiQuatKey"
+    # Matches the struct's layout, for reading whole arrays of keys at once
+    DTYPE: ClassVar[numpy.dtype] = numpy.dtype([('time', numpy.float64), ('value', numpy.float32, 4)])
 
     time: float = SimpleAccessor(name='mTime')
     """The time of this key"""
@@ -1273,8 +1361,16 @@ class MeshMorphKey(SerializableStruct):
     time: float = SimpleAccessor(name='mTime')
     """The time of this key"""
 
-    values: BaseSequence[int] = DynamicSequenceAccessor('mValues', 'mNumValuesAndWeights', int)
-    weights: BaseSequence[float] = DynamicSequenceAccessor('mWeights', 'mNumValuesAndWeights', float)
+    values: BaseSequence[int] = DynamicSequenceAccessor('mValues', 'mNumValuesAndWeights', None)
+    """The values and weights at the time of this key"""
+
+    weights: BaseSequence[float] = DynamicSequenceAccessor('mWeights', 'mNumValuesAndWeights', None)
+
+    values_array: numpy.ndarray = ContiguousVecAccessor('mValues', 'mNumValuesAndWeights', numpy.dtype(numpy.uint32))
+    """`values` as a zero-copy uint32 array"""
+
+    weights_array: numpy.ndarray = ContiguousVecAccessor('mWeights', 'mNumValuesAndWeights', numpy.dtype(numpy.float64))
+    """`weights` as a zero-copy float64 array"""
 
     num_values_and_weights: int = SimpleAccessor(name='mNumValuesAndWeights')
     """The number of values and weights"""
@@ -1314,6 +1410,9 @@ class NodeAnim(SerializableStruct):
     scaling and one rotation key.
     """
 
+    position_keys_array: numpy.ndarray = ContiguousVecAccessor('mPositionKeys', 'mNumPositionKeys', VectorKey.DTYPE)
+    """`position_keys` as a zero-copy structured array with `time` and `value` fields"""
+
     rotation_keys: BaseSequence[QuatKey] = DynamicSequenceAccessor('mRotationKeys', 'mNumRotationKeys', QuatKey)
     """
     The rotation keys of this animation channel. Rotations are
@@ -1323,6 +1422,9 @@ class NodeAnim(SerializableStruct):
     scaling and one position key.
     """
 
+    rotation_keys_array: numpy.ndarray = ContiguousVecAccessor('mRotationKeys', 'mNumRotationKeys', QuatKey.DTYPE)
+    """`rotation_keys` as a zero-copy structured array with `time` and `value` (w, x, y, z) fields"""
+
     scaling_keys: BaseSequence[VectorKey] = DynamicSequenceAccessor('mScalingKeys', 'mNumScalingKeys', VectorKey)
     """
     The scaling keys of this animation channel. Scalings are
@@ -1331,6 +1433,9 @@ class NodeAnim(SerializableStruct):
     position and one rotation key.
     """
 
+    scaling_keys_array: numpy.ndarray = ContiguousVecAccessor('mScalingKeys', 'mNumScalingKeys', VectorKey.DTYPE)
+    """`scaling_keys` as a zero-copy structured array with `time` and `value` fields"""
+
     pre_state: int = SimpleAccessor(name='mPreState')
     """
     Defines how the animation behaves before the first
@@ -1373,6 +1478,9 @@ class MeshAnim(SerializableStruct):
     keys: BaseSequence[MeshKey] = DynamicSequenceAccessor('mKeys', 'mNumKeys', MeshKey)
     """Key frames of the animation. May not be NULL."""
 
+    keys_array: numpy.ndarray = ContiguousVecAccessor('mKeys', 'mNumKeys', MeshKey.DTYPE)
+    """`keys` as a zero-copy structured array with `time` and `value` fields"""
+
 
 C_SRC += """
 // See 'anim.h' for details.
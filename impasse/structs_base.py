@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import abc
+import functools
 import inspect
-import weakref
+import operator
 from typing import *
 
 import cffi
@@ -16,13 +17,40 @@ if TYPE_CHECKING:
 ffi = cffi.FFI()
 
 
-# A map of FFI.CData -> Scene that keeps the scene alive as long as some CData stemming
-# from Scene memory is still referenced. Might seem nasty, but this is the officially
-# sanctioned way of doing things!
-# https://cffi.readthedocs.io/en/latest/using.html#working-with-pointers-structures-and-arrays
-# Only needed when we return things that can't themselves hold strong references to the Scene
-# object, like numpy arrays.
-_live_scene_referents_map = weakref.WeakKeyDictionary()
+def _release_scene_pin(scene: Scene, cdata):
+    """Destructor for `_pin_scene()`, dropping its reference to the scene is all it has to do"""
+
+
+def _pin_scene(cdata, scene: Scene):
+    """
+    Get a `cdata` pointing to the same memory that keeps `scene` alive while it's referenced
+
+    Use this for memory viewed through things that can't otherwise reference the scene,
+    like the `ffi.buffer()` backing a NumPy array. The reference is tied to the returned
+    object itself, so every view of the same memory keeps the scene alive independently.
+    """
+    return ffi.gc(cdata, functools.partial(_release_scene_pin, scene))
+
+
+_UINT_PTR_TYPE = ffi.typeof("unsigned int *")
+_CHAR_PTR_TYPE = ffi.typeof("char *")
+
+
+# Struct types only get declared once `structs` is imported, so these are looked up lazily.
+# cffi would otherwise re-resolve the type string on every call.
+@functools.lru_cache(maxsize=None)
+def _sizeof_c_type(c_type: str) -> int:
+    return ffi.sizeof(c_type)
+
+
+@functools.lru_cache(maxsize=None)
+def _c_pointer_type(c_type: str):
+    return ffi.typeof(ffi.getctype(c_type, "*"))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_offset(c_type: str, field: str) -> int:
+    return ffi.offsetof(c_type, field)
 
 
 class CSerializableBase(abc.ABC):
@@ -65,6 +93,10 @@ class ExprAdapter(CSerializableBase):
 class SerializableStruct(CSerializableBase):
     C_TYPE: ClassVar[str]
 
+    # Wrappers get created on every field access, keep them small and make
+    # `self.struct` lookups (done for every field read) a plain slot load.
+    __slots__ = ("struct", "_scene", "_readonly", "_seq_cache", "__weakref__")
+
     def __init__(self, struct_val, scene: Optional[Scene] = None):
         self.struct: Any = struct_val
         # Strong reference Scene has no strong references to its own children
@@ -83,11 +115,16 @@ class SerializableStruct(CSerializableBase):
     def to_c(cls, instance, struct_val: Optional[SerializableStruct]):
         if struct_val is None:
             return None
-        instance[0] = struct_val.struct
+        struct = struct_val.struct
+        # Wrappers of array elements hold a pointer to the element, copy the struct itself
+        # when writing into a struct slot rather than a pointer slot.
+        if ffi.typeof(struct).kind == "pointer" and ffi.typeof(instance).item.kind == "struct":
+            struct = struct[0]
+        instance[0] = struct
 
     @classmethod
     def from_address(cls, address: int):
-        return cls.from_c(ffi.cast(ffi.getctype(cls.C_TYPE, "*"), address))
+        return cls.from_c(ffi.cast(_c_pointer_type(cls.C_TYPE), address))
 
     def get_scene(self) -> Optional[Scene]:
         if self.C_TYPE == "struct aiScene":
@@ -104,11 +141,7 @@ class SerializableStruct(CSerializableBase):
         return other.struct == self.struct
 
     def __repr__(self):
-        field_names = []
-        for attr_name, attr_val in inspect.getmembers(self.__class__):
-            if isinstance(attr_val, BaseAccessor):
-                field_names.append(attr_name)
-        field_vals = {k: getattr(self, k) for k in field_names}
+        field_vals = {k: getattr(self, k) for k in _accessor_names(self.__class__)}
         field_reprs = ""
         for k, v in field_vals.items():
             # Prevent infinite recursion in recursive structures,
@@ -127,6 +160,12 @@ class SerializableStruct(CSerializableBase):
         return f"<{self.__class__.__name__}{field_reprs}>"
 
 
+@functools.lru_cache(maxsize=None)
+def _accessor_names(cls: Type[SerializableStruct]) -> Tuple[str, ...]:
+    """Names of all of `cls`'s field accessors, `inspect.getmembers()` is too slow to call per `repr()`"""
+    return tuple(name for name, val in inspect.getmembers(cls) if isinstance(val, BaseAccessor))
+
+
 class LazyStruct(NamedTuple):
     """Necessary wrapper for self-referential structs that force late binding"""
     lazy: Callable[[], Type[SerializableStruct]]
@@ -146,24 +185,37 @@ class CStrAdapter(CSerializableBase):
 
 
 class NumPyStruct(SerializableStruct):
+    __slots__ = ()
     SHAPE: ClassVar[Tuple[int, ...]]
     DTYPE: ClassVar[numpy.dtype]
     NUM_ELEMS: int
+    _ARRAY_DTYPE: ClassVar[numpy.dtype]
+    _NUM_BYTES: ClassVar[int]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Work these out once per type rather than on every `from_c()`
+        if "DTYPE" in cls.__dict__:
+            cls._ARRAY_DTYPE = numpy.dtype(cls.DTYPE)
+            cls._NUM_BYTES = cls._ARRAY_DTYPE.itemsize * int(numpy.prod(cls.SHAPE))
 
     @classmethod
     def get_size(cls):
-        ctype = ffi.getctype(cls.C_TYPE)
-        return ffi.sizeof(ctype)
+        return _sizeof_c_type(cls.C_TYPE)
 
     @classmethod
     def from_c(cls, struct_val, scene: Optional[Scene] = None):
+        return cls.view_c(ffi.addressof(struct_val), scene)
+
+    @classmethod
+    def view_c(cls, cdata, scene: Optional[Scene] = None):
+        """View the struct that `cdata` points to as an array"""
         assert scene is not None
-        cdata = ffi.addressof(struct_val)
-        _live_scene_referents_map[cdata] = scene
-        # NumPy will keep a strong reference to this in its `.base` attr
-        buf = ffi.buffer(cdata, cls.get_size())
-        arr = numpy.ndarray(buffer=buf, shape=cls.SHAPE, dtype=cls.DTYPE)
-        arr.flags.writeable = scene is None or not scene.readonly
+        # NumPy will keep a strong reference to this, and so the scene, in its `.base` attr
+        buf = ffi.buffer(_pin_scene(cdata, scene), cls._NUM_BYTES)
+        arr = numpy.ndarray(cls.SHAPE, cls._ARRAY_DTYPE, buf)
+        if scene.readonly:
+            arr.flags.writeable = False
         return arr
 
     @classmethod
@@ -190,10 +242,18 @@ class NumPyStruct(SerializableStruct):
         return super().from_c(struct_val, scene)
 
 
+@functools.lru_cache(maxsize=4096)
+def _decode_ai_string(raw: bytes) -> str:
+    """Node, bone and channel names repeat a lot within a scene, so share one `str` per name"""
+    return raw.decode("utf8", errors="replace")
+
+
 class StringAdapter(SerializableStruct):
+    __slots__ = ()
+
     @classmethod
     def from_c(cls, struct_val, scene: Optional[Scene] = None):
-        return ffi.string(struct_val.data, struct_val.length).decode("utf8", errors="replace")
+        return _decode_ai_string(ffi.string(struct_val.data, struct_val.length))
 
     @classmethod
     def to_c(cls, instance, value: Union[str, bytes]):
@@ -271,8 +331,16 @@ _T = TypeVar("_T")
 _SEQ_T = TypeVar("_SEQ_T", bound=Sequence)
 
 
+def _wraps_struct_ptr(adapter) -> bool:
+    """Whether `adapter` makes wrappers that are happy to be given a pointer to their struct"""
+    if isinstance(adapter, ProxyAdapter):
+        adapter = adapter.adapter
+    return isinstance(adapter, type) and issubclass(adapter, SerializableStruct) \
+        and not issubclass(adapter, NumPyStruct)
+
+
 class BaseSequence(Sequence[_T], abc.ABC):
-    __slots__ = ("elems_ptr", "elem_adapter", "_scene")
+    __slots__ = ("elems_ptr", "elem_adapter", "_scene", "_elems_by_ptr")
 
     def __init__(self, elems_ptr, elem_adapter, scene: Optional[Scene] = None):
         super().__init__()
@@ -281,15 +349,40 @@ class BaseSequence(Sequence[_T], abc.ABC):
             elem_adapter = elem_adapter.lazy()
         self.elem_adapter = elem_adapter or IdentityAdapter
         self._scene = scene
+        # Wrap elements of struct arrays through pointers rather than struct values, field
+        # access on the wrapper can then skip the very slow `ffi.addressof()`.
+        self._elems_by_ptr = False
+        if _wraps_struct_ptr(self.elem_adapter):
+            ptr_type = ffi.typeof(elems_ptr)
+            self._elems_by_ptr = ptr_type.kind in ("pointer", "array") and ptr_type.item.kind == "struct"
 
     def __getitem__(self, i: Union[slice, int]) -> Union[_T, List[_T]]:
         if isinstance(i, int):
             if 0 > i or i >= len(self):
                 raise IndexError(f"{i} is out of range")
-            val = self.elems_ptr[i]
+            val = self.elems_ptr + i if self._elems_by_ptr else self.elems_ptr[i]
             return self.elem_adapter.from_c(val, self._scene)
         return [self[idx] for idx in range(*i.indices(len(self)))]
 
+    def __iter__(self) -> Iterator[_T]:
+        # Skips the per-index bounds check and length lookup that `Sequence.__iter__()` would do
+        from_c = self.elem_adapter.from_c
+        scene = self._scene
+        num_elems = len(self)
+        if not num_elems:
+            return
+        elems_ptr = self.elems_ptr
+        if self._elems_by_ptr:
+            for i in range(num_elems):
+                yield from_c(elems_ptr + i, scene)
+        elif ffi.typeof(elems_ptr).item.kind == "pointer":
+            # Fetch all the pointers in one go with a single C-level loop
+            for val in ffi.unpack(elems_ptr, num_elems):
+                yield from_c(val, scene)
+        else:
+            for i in range(num_elems):
+                yield from_c(elems_ptr[i], scene)
+
     def __setitem__(self, key: int, value: _T):
         if self._scene is not None and self._scene.readonly:
             raise KeyError("Refusing to write to Sequence belonging to readonly scene")
@@ -338,6 +431,8 @@ _V = TypeVar("_V")
 
 
 class SerializableMapping(SerializableStruct, Mapping[_K, _V], abc.ABC):
+    __slots__ = ()
+
     def __repr__(self):
         return f"{self.__class__.__name__}<{dict(self)!r}>"
 
@@ -349,6 +444,16 @@ class SerializableMapping(SerializableStruct, Mapping[_K, _V], abc.ABC):
         return dict(self) == other
 
 
+def _field_pointer(obj: SerializableStruct, name: str, ptr_type):
+    """`ffi.addressof(obj.struct, name)` cast to `ptr_type`, but several times faster"""
+    try:
+        base = ffi.cast(_CHAR_PTR_TYPE, obj.struct)
+    except TypeError:
+        # A struct value rather than a pointer to one, can't do pointer arithmetic on that.
+        return ffi.cast(ptr_type, ffi.addressof(obj.struct, name))
+    return ffi.cast(ptr_type, base + _field_offset(obj.C_TYPE, name))
+
+
 class BaseAccessor(Generic[_T], abc.ABC):
     __slots__ = ("name",)
 
@@ -365,6 +470,17 @@ class SimpleAccessor(BaseAccessor[_T]):
 
     __slots__ = ("adapter",)
 
+    def __new__(cls, name: Optional[str] = None, adapter=None):
+        # Plain C values and NumPy structs have cheaper accessors, use those.
+        if cls is SimpleAccessor:
+            if adapter is None:
+                return PrimitiveAccessor(name)
+            elif isinstance(adapter, type) and issubclass(adapter, NumPyStruct):
+                cls = NumPyFieldAccessor
+            elif adapter is StringAdapter:
+                cls = StringFieldAccessor
+        return super().__new__(cls)
+
     def __init__(self, name: Optional[str] = None, adapter=None):
         super().__init__(name)
         self.adapter = adapter or IdentityAdapter
@@ -385,6 +501,68 @@ class SimpleAccessor(BaseAccessor[_T]):
         self.adapter.to_c(ffi.addressof(obj.struct, self.name), val)
 
 
+class PrimitiveAccessor(property):
+    """
+    Accessor for fields that need no adapter, like ints and floats
+
+    cffi already converts these, so skip the generic adapter dispatch. Reads are the
+    hottest path there is, so this is a `property` with an `attrgetter()` getter,
+    which makes reads happen entirely in C rather than going through a Python `__get__()`.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        if name is not None:
+            self._bind(name)
+
+    def __set_name__(self, owner, name: str):
+        if self.name is None:
+            self.name = name
+            self._bind(name)
+
+    def _bind(self, name: str):
+        def _set(obj: SerializableStruct, val: Any):
+            if obj.readonly:
+                raise AttributeError(f"{obj!r} belongs to a readonly scene, can't assign {name}")
+            setattr(obj.struct, name, val)
+
+        property.__init__(self, operator.attrgetter(f"struct.{name}"), _set)
+
+
+BaseAccessor.register(PrimitiveAccessor)
+
+
+class NumPyFieldAccessor(SimpleAccessor[numpy.ndarray]):
+    """Accessor for `NumPyStruct` fields, viewing the field in place without the generic adapter dispatch"""
+    __slots__ = ()
+
+    def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> numpy.ndarray:
+        cdata = _field_pointer(obj, self.name, _c_pointer_type(self.adapter.C_TYPE))
+        return self.adapter.view_c(cdata, obj.get_scene())
+
+
+class StringFieldAccessor(SimpleAccessor[str]):
+    """Accessor for `aiString` fields, decoding them without the generic adapter dispatch"""
+    __slots__ = ()
+
+    def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> str:
+        val = getattr(obj.struct, self.name)
+        return _decode_ai_string(ffi.string(val.data, val.length))
+
+
+class StringValueAccessor(BaseAccessor[str]):
+    """Accessor for the decoded value of the `aiString`-like struct it's on"""
+    __slots__ = ()
+
+    def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> str:
+        return StringAdapter.from_c(obj.struct)
+
+    def __set__(self, obj: SerializableStruct, val: Union[str, bytes]):
+        if obj.readonly:
+            raise AttributeError(f"{obj!r} belongs to a readonly scene, can't assign {self.name}")
+        StringAdapter.to_c(obj.struct, val)
+
+
 class StaticSequenceAccessor(BaseAccessor[_SEQ_T]):
     __slots__ = ("size", "elem_adapter")
 
@@ -410,23 +588,114 @@ class DynamicSequenceAccessor(BaseAccessor[_SEQ_T]):
         self.elem_adapter = elem_adapter
 
     def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> _SEQ_T:
-        return DynamicSequence(
-            getattr(obj.struct, self.name),
+        elems_ptr = getattr(obj.struct, self.name)
+        scene = obj.get_scene()
+        # Sequences are cached on the wrapper so repeated reads of `node.children` and such
+        # don't rebuild them. Length is read through `size_ptr` so can't go stale, but the
+        # elements may have been reallocated, so only reuse if they're still in the same place.
+        # Not done on the scene itself since the sequence referencing it would make a cycle,
+        # delaying the scene's release until the cyclic GC gets around to it.
+        seq_cache = None
+        if scene is not obj:
+            try:
+                seq_cache = obj._seq_cache
+            except AttributeError:
+                seq_cache = obj._seq_cache = {}
+            seq = seq_cache.get(self.name)
+            if seq is not None and seq.elems_ptr == elems_ptr:
+                return seq
+
+        elem_adapter = self.elem_adapter
+        if isinstance(elem_adapter, LazyStruct):
+            # Only needs resolving once, not every time a sequence gets made
+            elem_adapter = self.elem_adapter = elem_adapter.lazy()
+        seq = DynamicSequence(
+            elems_ptr,
             # Get pointer of size field so we can take note of changes
-            ffi.cast("unsigned int *", ffi.addressof(obj.struct, self.num_name)),
-            self.elem_adapter,
-            scene=obj.get_scene(),
+            _field_pointer(obj, self.num_name, _UINT_PTR_TYPE),
+            elem_adapter,
+            scene=scene,
         )
+        if seq_cache is not None:
+            seq_cache[self.name] = seq
+        return seq
+
+
+def _c_array_view(elems_ptr, shape: Tuple[int, ...], dtype: numpy.dtype, scene: Optional[Scene]) -> numpy.ndarray:
+    """View the C array at `elems_ptr` as an array of `shape`, keeping `scene` alive while it's in use"""
+    if not shape[0]:
+        return numpy.empty(shape, dtype=dtype)
+    if scene is not None:
+        elems_ptr = _pin_scene(elems_ptr, scene)
+    # NumPy will keep a strong reference to the buffer, and so the pointer, in `.base`
+    buf = ffi.buffer(elems_ptr, int(numpy.prod(shape)) * dtype.itemsize)
+    arr = numpy.ndarray(buffer=buf, shape=shape, dtype=dtype)
+    arr.flags.writeable = scene is None or not scene.readonly
+    return arr
+
+
+class ContiguousVecAccessor(BaseAccessor[numpy.ndarray]):
+    """
+    Accessor for a pointer to `num_name` contiguous `elem_type`s, returned as one array
+
+    `elem_type` is either a `NumPyStruct` or a scalar `numpy.dtype`. Gives an
+    `(N, *elem_type.SHAPE)` view over the C memory, so no per-element wrappers.
+    """
+    __slots__ = ("num_name", "elem_shape", "elem_dtype")
+
+    def __init__(self, name: str, num_name: str, elem_type: Union[Type[NumPyStruct], numpy.dtype]):
+        super().__init__(name)
+        self.num_name = num_name
+        if isinstance(elem_type, numpy.dtype):
+            self.elem_shape, self.elem_dtype = (), elem_type
+        else:
+            self.elem_shape, self.elem_dtype = elem_type.SHAPE, numpy.dtype(elem_type.DTYPE)
+
+    def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> numpy.ndarray:
+        elems_ptr = getattr(obj.struct, self.name)
+        # null pointer means 0 len even if the size field says otherwise
+        num_elems = getattr(obj.struct, self.num_name) if elems_ptr else 0
+        return _c_array_view(elems_ptr, (num_elems, *self.elem_shape), self.elem_dtype, obj.get_scene())
+
+
+class TriangleIndicesAccessor(BaseAccessor[numpy.ndarray]):
+    """
+    Accessor for all of a triangulated mesh's face indices as one `(num_faces, 3)` array
+
+    Copies the indices straight out of C memory without wrapping each face.
+    `None` if any of the faces isn't a triangle.
+    """
+    __slots__ = ()
+
+    def __get__(self, obj: Mesh, owner: Optional[Type] = None) -> Optional[numpy.ndarray]:
+        faces_ptr = getattr(obj.struct, self.name)
+        num_faces = obj.struct.mNumFaces if faces_ptr else 0
+        out = numpy.empty((num_faces, 3), dtype=numpy.uint32)
+        if not num_faces:
+            return out
+        # Check all the faces' `mNumIndices` at once before reading any indices
+        face_size = _sizeof_c_type("struct aiFace")
+        num_indices = numpy.frombuffer(
+            ffi.buffer(faces_ptr, num_faces * face_size), dtype=numpy.uint32
+        )[::face_size // 4]
+        if (num_indices != 3).any():
+            return None
+        # Each face's indices are separately allocated, so this still needs a loop,
+        # but it's a C-level copy per face rather than a wrapper and a sequence.
+        out_ptr = ffi.from_buffer("unsigned int[]", out)
+        for i in range(num_faces):
+            ffi.memmove(out_ptr + i * 3, faces_ptr[i].mIndices, 12)
+        return out
 
 
 class VertexPropSequenceAccessor(StaticSequenceAccessor):
     __slots__ = ()
 
     def __get__(self, obj: SerializableStruct, owner: Optional[Type] = None) -> _SEQ_T:
-        vertices_ptr = ffi.cast("unsigned int *", ffi.addressof(obj.struct, "mNumVertices"))
-        serializer = ExprAdapter(
-            lambda x, scene: DynamicSequence(x, vertices_ptr, self.elem_adapter, scene=scene)
-        )
+        # Each channel is a contiguous block of `mNumVertices` elements, view it as a single array.
+        shape = (obj.struct.mNumVertices, *self.elem_adapter.SHAPE)
+        dtype = numpy.dtype(self.elem_adapter.DTYPE)
+        serializer = ExprAdapter(lambda x, scene: _c_array_view(x, shape, dtype, scene))
         return StaticSequence(
             getattr(obj.struct, self.name),
             self.size,
@@ -447,6 +716,9 @@ class TextureDataAccessor(SimpleAccessor[Union[bytes, numpy.ndarray]]):
             # Uncompressed RGBA8888
             # This is actually an aiTexel, a struct of 4 bytes, but the structs
             # are explicitly packed so we can treat as a contiguous byte array.
+            if scene is not None:
+                pcdata = _pin_scene(pcdata, scene)
+            # NumPy will keep a strong reference to the buffer, and so the pointer, in `.base`
             buf = ffi.buffer(pcdata, obj.height * obj.width * 4)
             val = numpy.ndarray(buffer=buf, dtype=numpy.ubyte, shape=(obj.height, obj.width, 4))
             val.flags.writeable = scene is None or not scene.readonly
@@ -485,11 +757,11 @@ class MetadataEntryDataAccessor(SimpleAccessor[METADATA_VAL]):
     __slots__ = ()
 
     _BASIC_TYPES = {
-        MetadataType.FLOAT: ffi.getctype("float*"),
-        MetadataType.INT32: ffi.getctype("int32_t*"),
-        MetadataType.DOUBLE: ffi.getctype("double*"),
-        MetadataType.UINT64: ffi.getctype("uint64_t*"),
-        MetadataType.BOOL: ffi.getctype("unsigned char*"),
+        MetadataType.FLOAT: ffi.typeof("float*"),
+        MetadataType.INT32: ffi.typeof("int32_t*"),
+        MetadataType.DOUBLE: ffi.typeof("double*"),
+        MetadataType.UINT64: ffi.typeof("uint64_t*"),
+        MetadataType.BOOL: ffi.typeof("unsigned char*"),
     }
 
     def __get__(self, instance: MetadataEntry, owner=None) -> METADATA_VAL:
@@ -516,6 +788,7 @@ class MetadataEntryDataAccessor(SimpleAccessor[METADATA_VAL]):
 
 
 class MetadataMapping(SerializableMapping[str, METADATA_VAL], abc.ABC):
+    __slots__ = ()
     num_properties: int
     meta_keys: BaseSequence[str]
     meta_values: BaseSequence[MetadataEntry]
@@ -526,18 +799,22 @@ class MetadataMapping(SerializableMapping[str, METADATA_VAL], abc.ABC):
     def __iter__(self) -> Iterator[str]:
         return iter(self.meta_keys)
 
-    def __getitem__(self, item: str) -> METADATA_VAL:
-        for i, k in enumerate(self.meta_keys):
-            if k == item:
-                return self.meta_values[i].data
+    def _find_index(self, item: str) -> int:
+        if isinstance(item, str):
+            # Compare against the raw key bytes rather than decoding every key
+            item_bytes = item.encode("utf8")
+            keys_ptr = self.struct.mKeys
+            for i in range(self.struct.mNumProperties if keys_ptr else 0):
+                raw_key = keys_ptr[i]
+                if ffi.string(raw_key.data, raw_key.length) == item_bytes:
+                    return i
         raise KeyError(repr(item))
 
+    def __getitem__(self, item: str) -> METADATA_VAL:
+        return self.meta_values[self._find_index(item)].data
+
     def __setitem__(self, item: str, value: METADATA_VAL):
-        for i, k in enumerate(self.meta_keys):
-            if k == item:
-                self.meta_values[i].data = value
-                return
-        raise KeyError(repr(item))
+        self.meta_values[self._find_index(item)].data = value
 
 
 # Materials-specific accessors and wrappers
@@ -612,22 +889,32 @@ PROPERTY_KEY = Union[str, REAL_PROPERTY_KEY]
 
 
 class MaterialMapping(SerializableMapping[PROPERTY_KEY, MATERIAL_PROP_VALUE], abc.ABC):
+    __slots__ = ()
     properties: BaseSequence[MaterialProperty]
 
     def __len__(self) -> int:
         return len(self.properties)
 
+    def _iter_raw_properties(self) -> Iterator:
+        props_ptr = self.struct.mProperties
+        for i in range(self.struct.mNumProperties if props_ptr else 0):
+            yield props_ptr[i]
+
     def __iter__(self) -> Iterator[REAL_PROPERTY_KEY]:
-        return iter(((p.key, p.semantic) for p in self.properties))
+        return iter(((StringAdapter.from_c(p.mKey), p.mSemantic) for p in self._iter_raw_properties()))
 
     def _get_prop(self, key: PROPERTY_KEY) -> MaterialProperty:
         if isinstance(key, str):
             item, semantic = key, TextureSemantic.NONE
         else:
             item, semantic = key
-        for prop in self.properties:
-            if prop.semantic == semantic and prop.key == item:
-                return prop
+        if isinstance(item, str):
+            # Only wrap the property that matches, compare the others' raw key bytes
+            item_bytes = item.encode("utf8")
+            for i, raw_prop in enumerate(self._iter_raw_properties()):
+                raw_key = raw_prop.mKey
+                if raw_prop.mSemantic == semantic and ffi.string(raw_key.data, raw_key.length) == item_bytes:
+                    return self.properties[i]
         raise KeyError(repr((item, semantic)))
 
     def __getitem__(self, item: PROPERTY_KEY) -> MATERIAL_PROP_VALUE:
@@ -45,7 +45,7 @@ def main(filename=None):
         print("    material id:" + str(scene.materials.index(mesh.material) + 1))
         print("    vertices:" + str(len(mesh.vertices)))
         print("    first 3 verts:\n" + str(numpy.array(mesh.vertices[:3])))
-        if mesh.normals:
+        if len(mesh.normals):
             print("    first 3 normals:\n" + str(numpy.array(mesh.normals[:3])))
         else:
             print("    no normals")
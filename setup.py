@@ -26,6 +26,10 @@ setup(
         # ('share/examples/impasse', ['scripts/' + f for f in os.listdir('scripts/')]),
     ],
     install_requires=['numpy', 'cffi'],
+    extras_require={
+        # Speeds up helper.get_bounding_box() and helper.compute_vertex_normals()
+        'jit': ['numba'],
+    },
     python_requires='>=3.7',
     zip_safe=False,
     tests_require=[
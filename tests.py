@@ -1,16 +1,22 @@
+import gzip
 import os.path
 import tempfile
 import unittest
 import weakref
 from io import BytesIO
+from unittest import mock
 
 import numpy
 
 import impasse
+from impasse import helper
 from impasse.errors import AssimpError
-from impasse.helper import get_bounding_box
-from impasse.structs import Scene
-from impasse.constants import TextureSemantic, MaterialPropertyKey
+from impasse.helper import (
+    compute_vertex_normals, get_bone_offset_matrices, get_bone_weights, get_bounding_box, get_face_indices,
+    get_interleaved_vertices, iter_face_indices
+)
+from impasse.structs import Face, MeshKey, MeshMorphKey, NodeAnim, QuatKey, Scene, String, VectorKey, VertexWeight, ffi
+from impasse.constants import TextureSemantic, MaterialPropertyKey, ProcessingStep, ProcessingPreset, any_flag
 
 # Find the root path of the test file, so we can find the
 # test models above our directory
@@ -32,6 +38,22 @@ class ImpasseTests(unittest.TestCase):
         # assimp changed how it autogenerates names in newer versions. Handle either case.
         self.assertTrue(bone_names == ["nodes_1", "nodes_2"] or bone_names == ["nodes[1]", "nodes[2]"])
 
+    def test_bone_weights(self):
+        scene = impasse.load(TEST_SKINNED_MODEL)
+        mesh = scene.meshes[0]
+        first_bone = mesh.bones[0]
+        self.assertEqual(first_bone.weights[0].weight, first_bone.weights_array['weight'][0])
+        vertex_ids, weights, offsets = get_bone_weights(mesh)
+        self.assertEqual(sum(len(b.weights) for b in mesh.bones), len(weights))
+        self.assertListEqual([w.vertex_id for w in first_bone.weights], list(vertex_ids[offsets[0]:offsets[1]]))
+
+    def test_bone_offset_matrices(self):
+        scene = impasse.load(TEST_SKINNED_MODEL)
+        mesh = scene.meshes[0]
+        offset_matrices = get_bone_offset_matrices(mesh)
+        self.assertEqual((len(mesh.bones), 4, 4), offset_matrices.shape)
+        numpy.testing.assert_array_equal(mesh.bones[1].offset_matrix, offset_matrices[1])
+
     def test_collada_parses(self):
         self.assertIsNotNone(impasse.load(TEST_COLLADA).root_node)
 
@@ -43,6 +65,24 @@ class ImpasseTests(unittest.TestCase):
         scene = impasse.load(stream, "collada")
         self.assertIsNotNone(scene.root_node)
 
+    def test_load_from_real_file(self):
+        with open(TEST_COLLADA, "rb") as f:
+            scene = impasse.load(f, "collada")
+        self.assertIsNotNone(scene.root_node)
+
+    def test_load_from_gzip_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            gz_path = os.path.join(temp_dir, "model.dae.gz")
+            with open(TEST_COLLADA, "rb") as f, gzip.open(gz_path, "wb") as gz_f:
+                gz_f.write(f.read())
+            with gzip.open(gz_path, "rb") as gz_f:
+                scene = impasse.load(gz_f, "collada")
+        self.assertIsNotNone(scene.root_node)
+
+    def test_load_direct(self):
+        scene = impasse.load_direct(TEST_COLLADA)
+        self.assertIsNotNone(scene.root_node)
+
     def test_materials_mapping(self):
         scene = impasse.load(TEST_COLLADA)
         material_map = scene.materials[0]
@@ -80,6 +120,20 @@ class ImpasseTests(unittest.TestCase):
         blob = impasse.export_blob(scene, "collada")
         self.assertTrue(blob[0].data.startswith(b"<?xml"))
 
+    def test_export_blob_chain_keeps_head_alive(self):
+        scene = impasse.load(TEST_COLLADA)
+        blobs = impasse.export_blob(scene, "obj")
+        # OBJ exports put the materials in a second blob
+        self.assertGreater(len(blobs), 1)
+        head_ref = weakref.ref(blobs[0])
+        chained, chained_again = blobs[1], blobs[0].next
+        expected_data = chained.data
+        blobs = chained = None  # noqa
+        self.assertIsNotNone(head_ref())
+        self.assertEqual(expected_data, chained_again.data)
+        chained_again = None  # noqa
+        self.assertIsNone(head_ref())
+
     def test_scene_immutable(self):
         scene = impasse.load(TEST_COLLADA)
         with self.assertRaises(AttributeError):
@@ -113,6 +167,90 @@ class ImpasseTests(unittest.TestCase):
         scene = impasse.load(TEST_COLLADA)
         self.assertListEqual([-400.0, 0.0, -200.0], list(scene.meshes[0].vertices[0]))
 
+    def test_mesh_vertex_arrays(self):
+        scene = impasse.load(TEST_COLLADA)
+        mesh = scene.meshes[0]
+        self.assertEqual((len(mesh.vertices_iter), 3), mesh.vertices.shape)
+        self.assertFalse(mesh.vertices.flags.writeable)
+        self.assertListEqual(list(mesh.vertices[0]), list(mesh.vertices_iter[0]))
+        self.assertEqual((len(mesh.normals_iter), 3), mesh.normals.shape)
+
+    def test_struct_dtypes_match_layout(self):
+        for struct_cls in (VertexWeight, VectorKey, QuatKey, MeshKey):
+            self.assertEqual(ffi.sizeof(struct_cls.C_TYPE), struct_cls.DTYPE.itemsize)
+
+    def test_string_value(self):
+        string = String(ffi.new("struct aiString *"))
+        string.value = "Fö"
+        self.assertEqual(3, string.length)
+        self.assertEqual("Fö", string.value)
+        self.assertEqual(b"F", string.data[0])
+
+    def test_string_values_shared(self):
+        strings = [String(ffi.new("struct aiString *")) for _ in range(2)]
+        for string in strings:
+            string.value = "Bone.001"
+        self.assertIs(strings[0].value, strings[1].value)
+
+    def test_morph_key_values(self):
+        key_struct = ffi.new("struct aiMeshMorphKey *")
+        values = ffi.new("unsigned int[]", [3, 4])
+        weights = ffi.new("double[]", [0.25, 0.75])
+        key_struct.mValues, key_struct.mWeights, key_struct.mNumValuesAndWeights = values, weights, 2
+        key = MeshMorphKey(key_struct)
+        self.assertListEqual([3, 4], list(key.values))
+        self.assertListEqual([0.25, 0.75], list(key.weights))
+        self.assertListEqual([3, 4], key.values_array.tolist())
+        self.assertEqual(numpy.float64, key.weights_array.dtype)
+        self.assertListEqual([0.25, 0.75], key.weights_array.tolist())
+
+    def test_assign_struct_sequence_element(self):
+        anim_struct = ffi.new("struct aiNodeAnim *")
+        keys = ffi.new("struct aiVectorKey[]", 2)
+        keys[1].mTime = 3.0
+        keys[1].mValue.x = 2.0
+        anim_struct.mPositionKeys, anim_struct.mNumPositionKeys = keys, 2
+        node_anim = NodeAnim(anim_struct)
+        node_anim.position_keys[0] = node_anim.position_keys[1]
+        self.assertEqual(3.0, node_anim.position_keys[0].time)
+        self.assertEqual(2.0, keys[0].mValue.x)
+
+    def test_mesh_triangles_array(self):
+        scene = impasse.load(TEST_COLLADA)
+        mesh = scene.meshes[0]
+        triangles = mesh.triangles_array
+        self.assertEqual((len(mesh.faces), 3), triangles.shape)
+        self.assertListEqual([list(face) for face in mesh.faces], triangles.tolist())
+        first_face = Face(mesh.struct.mFaces, scene)
+        self.assertListEqual(list(mesh.faces[0]), list(first_face.indices_array))
+
+    def test_iter_face_indices(self):
+        scene = impasse.load(TEST_COLLADA)
+        mesh = scene.meshes[0]
+        self.assertListEqual([list(face) for face in mesh.faces], [list(face) for face in iter_face_indices(mesh)])
+
+    def test_get_face_indices(self):
+        scene = impasse.load(TEST_COLLADA)
+        mesh = scene.meshes[0]
+        counts, indices = get_face_indices(mesh)
+        self.assertListEqual([len(face) for face in mesh.faces], list(counts))
+        self.assertListEqual([idx for face in mesh.faces for idx in face], list(indices))
+
+    def test_compute_vertex_normals(self):
+        # Two triangles folded along the shared edge, plus one unused vertex
+        vertices = numpy.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [5, 5, 5]], dtype=numpy.float32)
+        triangles = numpy.array([[0, 1, 2], [0, 3, 1]], dtype=numpy.uint32)
+        normals = compute_vertex_normals(vertices, triangles)
+        diag = 1 / numpy.sqrt(2)
+        numpy.testing.assert_allclose(
+            [[0, diag, diag], [0, diag, diag], [0, 0, 1], [0, 1, 0], [0, 0, 0]], normals, atol=1e-6)
+
+    def test_sequences_cached_on_wrapper(self):
+        scene = impasse.load(TEST_COLLADA)
+        root = scene.root_node
+        self.assertIs(root.children, root.children)
+        self.assertEqual(len(scene.root_node.children), len(root.children))
+
     def test_mutating_mesh_numpy_properties(self):
         scene = impasse.load(TEST_COLLADA).copy_mutable()
         verts_copy: numpy.ndarray = scene.meshes[0].vertices[0].copy()
@@ -127,6 +265,14 @@ class ImpasseTests(unittest.TestCase):
         # Check that we actually mutated the underlying data
         self.assertEqual(40.0, scene.meshes[0].vertices[0][1])
 
+    def test_mutating_mesh_vertices_in_place(self):
+        scene = impasse.load(TEST_COLLADA)
+        self.assertFalse(scene.meshes[0].vertices.flags.writeable)
+        scene = scene.copy_mutable()
+        expected = scene.meshes[0].vertices * 2
+        scene.meshes[0].vertices[:] *= 2
+        numpy.testing.assert_array_equal(expected, scene.meshes[0].vertices)
+
     def test_mutate_diffuse_color(self):
         scene = impasse.load(TEST_COLLADA).copy_mutable()
         material = scene.materials[1]
@@ -151,6 +297,16 @@ class ImpasseTests(unittest.TestCase):
         scene = impasse.load(TEST_TEXTURED)
         first_coord = scene.meshes[0].texture_coords[0][0]
         numpy.testing.assert_almost_equal([6, 1, 0], first_coord, 5)
+        self.assertEqual((len(scene.meshes[0].vertices), 3), scene.meshes[0].texture_coords[0].shape)
+
+    def test_interleaved_vertices(self):
+        mesh = impasse.load(TEST_TEXTURED).meshes[0]
+        interleaved = get_interleaved_vertices(mesh, ("vertices", "texture_coords0"))
+        self.assertEqual((len(mesh.vertices), 5), interleaved.shape)
+        numpy.testing.assert_array_equal(mesh.vertices, interleaved[:, :3])
+        numpy.testing.assert_array_equal(mesh.texture_coords[0][:, :2], interleaved[:, 3:])
+        with self.assertRaises(ValueError):
+            get_interleaved_vertices(mesh, ("texture_coords7",))
 
     def test_num_uv_coords(self):
         scene = impasse.load(TEST_TEXTURED)
@@ -167,10 +323,41 @@ class ImpasseTests(unittest.TestCase):
         numpy.testing.assert_almost_equal([-0.5, -0.5, -0.5], bb_min, 5)
         numpy.testing.assert_almost_equal([0.5, 0.5, 0.5], bb_max, 5)
 
+    def test_bounding_box_for_node_updates_in_place(self):
+        scene = impasse.load(TEST_TEXTURED)
+        results = []
+        # Once with the numba kernel if it's installed, once with the plain NumPy path
+        for kernel in (helper._get_bounds_kernel(), None):
+            bb_min, bb_max = numpy.full(3, 1e10), numpy.full(3, -1e10)
+            with mock.patch.object(helper, "_get_bounds_kernel", return_value=kernel):
+                helper.get_bounding_box_for_node(scene, scene.root_node, bb_min, bb_max, numpy.identity(4))
+            results.append((bb_min, bb_max))
+        for bb_min, bb_max in results:
+            numpy.testing.assert_almost_equal([-0.5, -0.5, -0.5], bb_min, 5)
+            numpy.testing.assert_almost_equal([0.5, 0.5, 0.5], bb_max, 5)
+
+    def test_bounding_box_from_aabb(self):
+        scene = impasse.load(TEST_TEXTURED, processing=ProcessingStep.GenBoundingBoxes)
+        numpy.testing.assert_almost_equal([-0.5, -0.5, -0.5], scene.meshes[0].aabb.min, 5)
+        bb_min, bb_max = get_bounding_box(scene)
+        numpy.testing.assert_almost_equal([-0.5, -0.5, -0.5], bb_min, 5)
+        numpy.testing.assert_almost_equal([0.5, 0.5, 0.5], bb_max, 5)
+
     def test_texture_data(self):
         scene = impasse.load(TEST_MDL_TEXTURED)
         self.assertEqual(scene.textures[0].data.shape, (1114, 1272, 4))
 
+    def test_texture_data_keeps_scene_alive(self):
+        scene = impasse.load(TEST_MDL_TEXTURED)
+        first_data, second_data = scene.textures[0].data, scene.textures[0].data
+        expected = second_data.copy()
+        scene_ref = weakref.ref(scene)
+        scene = first_data = None  # noqa
+        self.assertIsNotNone(scene_ref())
+        numpy.testing.assert_array_equal(expected, second_data)
+        second_data = None  # noqa
+        self.assertIsNone(scene_ref())
+
     def test_access_indices(self):
         scene = impasse.load(TEST_COLLADA).copy_mutable()
         self.assertEqual(2, scene.meshes[0].faces[0][2])
@@ -190,6 +377,19 @@ class ImpasseTests(unittest.TestCase):
         # Releasing the last numpy array should have triggered a release of the scene
         self.assertIsNone(scene_ref())
 
+    def test_every_array_view_keeps_scene_alive(self):
+        scene = impasse.load(TEST_COLLADA)
+        first_view, second_view = scene.meshes[0].vertices, scene.meshes[0].vertices
+        expected = second_view.copy()
+        scene_ref = weakref.ref(scene)
+        # Views of the same memory must each keep the scene alive, not just the first one
+        scene = first_view = None  # noqa
+        self.assertIsNotNone(scene_ref())
+        # Will trigger a valgrind error if the scene released its memory
+        numpy.testing.assert_array_equal(expected, second_view)
+        second_view = None  # noqa
+        self.assertIsNone(scene_ref())
+
     def test_modify_indices(self):
         scene = impasse.load(TEST_COLLADA).copy_mutable()
         scene.meshes[0].faces[0][2] = 3
@@ -232,6 +432,59 @@ class ImpasseTests(unittest.TestCase):
             with self.assertRaises(AssimpError):
                 impasse.export(scene, f.name, "foobar")
 
+    def test_processing_step_flags(self):
+        flags = ProcessingStep.Triangulate | ProcessingStep.FlipUVs
+        self.assertIsInstance(flags, ProcessingStep)
+        self.assertEqual(0x800008, flags)
+        self.assertIs(ProcessingStep(0x8), ProcessingStep.Triangulate)
+        self.assertIn(ProcessingStep.Triangulate, flags)
+        self.assertNotIn(ProcessingStep.GenNormals, flags)
+        self.assertEqual("Triangulate|FlipUVs", flags.name)
+        self.assertListEqual([ProcessingStep.Triangulate, ProcessingStep.FlipUVs], list(flags))
+        self.assertTrue(ProcessingStep.has(int(flags), ProcessingStep.FlipUVs))
+        self.assertFalse(ProcessingStep.has(flags, ProcessingStep.FlipUVs | ProcessingStep.GenNormals))
+        self.assertTrue(ProcessingStep.any(flags, ProcessingStep.FlipUVs | ProcessingStep.GenNormals))
+
+    def test_composite_flags_not_kept_as_members(self):
+        num_values = len(ProcessingStep._value_to_member_map_)
+        for i in range(5000):
+            ProcessingStep(i << 1)
+        self.assertEqual(num_values, len(ProcessingStep._value_to_member_map_))
+
+    def test_vectorized_flags(self):
+        masks = numpy.array([ProcessingPreset.TargetRealtime_Fast, ProcessingStep.FlipUVs], dtype=numpy.uint32)
+        self.assertListEqual([True, False], list(any_flag(masks, ProcessingStep.Triangulate)))
+
+    def test_enum_lookup(self):
+        self.assertIs(TextureSemantic(1), TextureSemantic.DIFFUSE)
+        self.assertEqual("DIFFUSE", TextureSemantic.DIFFUSE.name)
+        with self.assertRaises(ValueError):
+            TextureSemantic(0xFFFF)
+        self.assertIs(TextureSemantic.SPECULAR, TextureSemantic.from_int(2))
+        with self.assertRaises(ValueError):
+            TextureSemantic.from_int(0xFFFF)
+
+    def test_processing_presets(self):
+        P = ProcessingStep
+        self.assertIsInstance(ProcessingPreset.TargetRealtime_Fast, ProcessingStep)
+        self.assertIn(P.Triangulate, ProcessingPreset.TargetRealtime_Fast)
+        self.assertEqual(P.MakeLeftHanded | P.FlipUVs | P.FlipWindingOrder, ProcessingPreset.ConvertToLeftHanded)
+        self.assertEqual(
+            P.CalcTangentSpace | P.GenNormals | P.JoinIdenticalVertices | P.Triangulate | P.GenUVCoords
+            | P.SortByPType,
+            ProcessingPreset.TargetRealtime_Fast,
+        )
+        quality = (
+            P.CalcTangentSpace | P.GenSmoothNormals | P.JoinIdenticalVertices | P.ImproveCacheLocality
+            | P.LimitBoneWeights | P.RemoveRedundantMaterials | P.SplitLargeMeshes | P.Triangulate
+            | P.GenUVCoords | P.SortByPType | P.FindDegenerates | P.FindInvalidData
+        )
+        self.assertEqual(quality, ProcessingPreset.TargetRealtime_Quality)
+        self.assertEqual(
+            quality | P.FindInstances | P.ValidateDataStructure | P.OptimizeMeshes,
+            ProcessingPreset.TargetRealtime_MaxQuality,
+        )
+
 
 if __name__ == "__main__":
     unittest.main()